@@ -2,133 +2,312 @@ import sqlite3
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Tuple, NamedTuple
 from contextlib import contextmanager
 import os
+import queue
+import threading
 
 from models import User, Quest, Badge, Achievement, Activity, UserStats
 
 logger = logging.getLogger(__name__)
 
+class AchievementRow(NamedTuple):
+    """Achievement columns the rewards checks need"""
+    id: str
+    progress: int
+    target: int
+    xp_reward: int
+
+# Whole schema for executescript; the script leaves its transaction open so
+# init_database can migrate and seed before the single commit
+_SCHEMA_SQL = """
+BEGIN IMMEDIATE;
+
+-- Users table (single row, always read by id = 1)
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    level INTEGER DEFAULT 1,
+    xp INTEGER DEFAULT 0,
+    total_xp INTEGER DEFAULT 0,
+    streak INTEGER DEFAULT 0,
+    completed_quests INTEGER DEFAULT 0,
+    last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+
+-- Quests table
+CREATE TABLE IF NOT EXISTS quests (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    type TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    xp_reward INTEGER NOT NULL,
+    status TEXT DEFAULT 'available',
+    category TEXT DEFAULT 'daily',
+    progress INTEGER DEFAULT 0,
+    target INTEGER DEFAULT 1,
+    deadline INTEGER,
+    icon TEXT DEFAULT 'fas fa-tasks',
+    requirements TEXT DEFAULT '{}',
+    created_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    completed_at INTEGER
+);
+
+-- Badges table
+CREATE TABLE IF NOT EXISTS badges (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    requirements TEXT,
+    icon TEXT DEFAULT 'fas fa-medal',
+    category TEXT DEFAULT 'achievement',
+    xp_requirement INTEGER DEFAULT 0,
+    quest_requirement INTEGER DEFAULT 0,
+    special_requirement TEXT
+);
+
+-- Achievements table
+CREATE TABLE IF NOT EXISTS achievements (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    icon TEXT DEFAULT 'fas fa-trophy',
+    progress INTEGER DEFAULT 0,
+    target INTEGER DEFAULT 1,
+    xp_reward INTEGER DEFAULT 100,
+    completed BOOLEAN DEFAULT FALSE,
+    completed_at TIMESTAMP
+);
+
+-- Activity table
+CREATE TABLE IF NOT EXISTS activity (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    description TEXT,
+    xp INTEGER DEFAULT 0,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- User stats table
+CREATE TABLE IF NOT EXISTS user_stats (
+    id INTEGER PRIMARY KEY,
+    files_organized INTEGER DEFAULT 0,
+    duplicates_removed INTEGER DEFAULT 0,
+    quests_completed INTEGER DEFAULT 0,
+    total_xp_earned INTEGER DEFAULT 0,
+    streak_days INTEGER DEFAULT 0,
+    folders_cleaned INTEGER DEFAULT 0,
+    space_freed INTEGER DEFAULT 0,
+    daily_quests_completed INTEGER DEFAULT 0
+) WITHOUT ROWID;
+
+-- Earned badges, one row per (user, badge)
+CREATE TABLE IF NOT EXISTS user_badges (
+    user_id INTEGER NOT NULL,
+    badge_id TEXT NOT NULL,
+    PRIMARY KEY (user_id, badge_id)
+);
+
+-- File content hashes by (device, inode); size and mtime_ns must still match
+-- for an entry to be reused, so modified files are hashed again
+CREATE TABLE IF NOT EXISTS hash_cache (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    algo TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (dev, ino, algo)
+) WITHOUT ROWID;
+
+-- Indexes for the ordered scans: recent activity walks the timestamp
+-- index backwards and stops after LIMIT rows
+CREATE INDEX IF NOT EXISTS idx_activity_ts ON activity(timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_quests_cat_created ON quests(category, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_quests_cat_status_deadline ON quests(category, status, deadline);
+"""
+
+# Statements on the hottest paths, kept as module constants so every call
+# passes sqlite3 the same text and hits the connection's statement cache.
+# Pooled connections live for the whole process, so these stay prepared
+# across requests much like persistent statements would.
+_GET_USER_SQL = "SELECT level, xp, total_xp, streak, completed_quests FROM users WHERE id = 1"
+# last_active is stored as UTC text; it is read back as the local day number
+# (days since 1970-01-01) so callers compare days without parsing timestamps.
+# A user row starts with last_active = created_at until the user is active.
+_GET_LAST_ACTIVE_DAY_SQL = """
+    SELECT CAST(julianday(last_active, 'localtime') - julianday('1970-01-01') AS INTEGER)
+    FROM users WHERE id = 1 AND last_active > created_at
+"""
+_GET_USER_BADGES_SQL = "SELECT badge_id FROM user_badges WHERE user_id = 1 ORDER BY rowid"
+_UPDATE_USER_SQL = """
+    UPDATE users SET 
+        level = MAX(1, :total_xp / 100 + 1), 
+        xp = :total_xp % 100, 
+        total_xp = :total_xp, 
+        streak = :streak, 
+        completed_quests = :completed_quests,
+        last_active = CURRENT_TIMESTAMP
+    WHERE id = 1
+"""
+
+_ADD_USER_BADGE_SQL = """
+    INSERT OR IGNORE INTO user_badges (user_id, badge_id) VALUES (1, ?)
+    RETURNING badge_id
+"""
+
+# Every right-hand side sees the pre-update row, so the new total is spelled
+# out in each assignment; the level formula matches _UPDATE_USER_SQL
+_AWARD_XP_SQL = """
+    UPDATE users SET 
+        total_xp = total_xp + :amount,
+        xp = (total_xp + :amount) % 100,
+        level = MAX(1, (total_xp + :amount) / 100 + 1)
+    WHERE id = 1
+    RETURNING level, xp, total_xp
+"""
+_ADD_ACTIVITY_SQL = """
+    INSERT INTO activity (type, description, xp, timestamp)
+    VALUES (?, ?, ?, ?)
+"""
+# Stamped by SQLite when the caller gives no timestamp. CURRENT_TIMESTAMP
+# would be UTC with a space separator, which sorts and parses differently
+# from the local ISO-8601 strings callers store.
+_ADD_ACTIVITY_NOW_SQL = """
+    INSERT INTO activity (type, description, xp, timestamp)
+    VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime'))
+"""
+_ADD_ACTIVITIES_SQL = """
+    INSERT INTO activity (type, description, xp, timestamp)
+    VALUES (?, ?, ?, COALESCE(?, strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime')))
+"""
+_SAVE_QUEST_SQL = """
+    INSERT OR REPLACE INTO quests 
+    (id, title, description, type, difficulty, xp_reward, status, category, 
+     progress, target, deadline, icon, requirements, created_at, completed_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# Filled with one "(?, ?)" per key; size and mtime_ns are checked by the caller
+_GET_CACHED_HASHES_SQL = """
+    SELECT dev, ino, size, mtime_ns, digest FROM hash_cache
+    WHERE algo = ? AND (dev, ino) IN (VALUES {})
+"""
+# Keeps each lookup under SQLite's default limit of 999 bound parameters
+_HASH_LOOKUP_CHUNK = 400
+_SAVE_HASH_SQL = """
+    INSERT OR REPLACE INTO hash_cache (dev, ino, algo, size, mtime_ns, digest)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+# completed is judged on the new progress; a bare "progress" on the right-hand
+# side would still read the row's old value
+_UPDATE_ACHIEVEMENT_PROGRESS_SQL = """
+    UPDATE achievements 
+    SET progress = :progress, completed = CASE WHEN :progress >= target THEN TRUE ELSE FALSE END
+    WHERE id = :id
+"""
+
 class DatabaseManager:
-    def __init__(self, db_path: str = "organizex.db"):
+    # Stat counters callers may increment, by API name
+    _STAT_COLS = {
+        "filesOrganized": "files_organized",
+        "duplicatesRemoved": "duplicates_removed",
+        "questsCompleted": "quests_completed",
+        "dailyQuestsCompleted": "daily_quests_completed"
+    }
+    
+    # Generated UPDATE per column combination, so each shape is built once
+    # and keeps hitting the same cached statement
+    _stat_update_sql: Dict[tuple, str] = {}
+    
+    def __init__(self, db_path: str = "organizex.db", pool_size: Optional[int] = None):
         self.db_path = db_path
+        self._wal_enabled = False
+        
+        # CPU count + 1 interchangeable connections: any of them reads or
+        # writes (writers serialize on BEGIN IMMEDIATE / SQLite's lock). They
+        # are opened up front and kept, so each one's page cache survives
+        # between requests
+        self.pool_size = pool_size or (os.cpu_count() or 1) + 1
+        self._pool = queue.Queue(maxsize=self.pool_size)
+        for _ in range(self.pool_size):
+            self._pool.put(self._open_connection())
+        
+        # The users/user_stats rows only change through this class, so reads
+        # are served from memory. Writers bump the version, which stops a read
+        # that raced with a write from caching what it fetched.
+        self._cache_lock = threading.Lock()
+        self._cache_version = 0
+        self._user_cache = None
+        self._user_stats_cache = None
+        
         self.init_database()
     
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a pooled connection; it may be used from any request thread"""
+        # isolation_level=None turns off the driver's implicit BEGIN handling:
+        # single statements autocommit and multi-statement writes open their
+        # own transaction explicitly
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=256,
+            isolation_level=None
+        )
+        self._configure_connection(conn)
+        return conn
+    
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """Apply performance pragmas to a freshly opened connection"""
+        # WAL mode persists in the database file, so only the first
+        # connection needs to switch it on
+        if not self._wal_enabled:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._wal_enabled = True
+        
+        # The rest are session-scoped and apply to this connection only
+        conn.execute("PRAGMA mmap_size=268435456")  # 256MB
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")  # 64MB
+        conn.execute("PRAGMA foreign_keys=ON")
+    
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = None
+        """Borrow a connection from the pool for the duration of the block"""
+        conn = self._pool.get()
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
             yield conn
         except Exception as e:
-            if conn:
-                conn.rollback()
+            conn.rollback()
             logger.error(f"Database error: {e}")
             raise
         finally:
-            if conn:
-                conn.close()
+            # Never hand the next caller a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put(conn)
+    
+    def close_all(self):
+        """Close every pooled connection (call on shutdown)"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
     
     def init_database(self):
         """Initialize database with required tables"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Users table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY,
-                    level INTEGER DEFAULT 1,
-                    xp INTEGER DEFAULT 0,
-                    total_xp INTEGER DEFAULT 0,
-                    streak INTEGER DEFAULT 0,
-                    badges TEXT DEFAULT '[]',
-                    completed_quests INTEGER DEFAULT 0,
-                    last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Quests table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS quests (
-                    id TEXT PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    type TEXT NOT NULL,
-                    difficulty TEXT NOT NULL,
-                    xp_reward INTEGER NOT NULL,
-                    status TEXT DEFAULT 'available',
-                    category TEXT DEFAULT 'daily',
-                    progress INTEGER DEFAULT 0,
-                    target INTEGER DEFAULT 1,
-                    deadline TIMESTAMP,
-                    icon TEXT DEFAULT 'fas fa-tasks',
-                    requirements TEXT DEFAULT '{}',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    completed_at TIMESTAMP
-                )
-            """)
+            conn.executescript(_SCHEMA_SQL)
             
-            # Badges table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS badges (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    requirements TEXT,
-                    icon TEXT DEFAULT 'fas fa-medal',
-                    category TEXT DEFAULT 'achievement',
-                    xp_requirement INTEGER DEFAULT 0,
-                    quest_requirement INTEGER DEFAULT 0,
-                    special_requirement TEXT
-                )
-            """)
-            
-            # Achievements table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS achievements (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    icon TEXT DEFAULT 'fas fa-trophy',
-                    progress INTEGER DEFAULT 0,
-                    target INTEGER DEFAULT 1,
-                    xp_reward INTEGER DEFAULT 100,
-                    completed BOOLEAN DEFAULT FALSE,
-                    completed_at TIMESTAMP
-                )
-            """)
-            
-            # Activity table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS activity (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    type TEXT NOT NULL,
-                    description TEXT,
-                    xp INTEGER DEFAULT 0,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # User stats table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS user_stats (
-                    id INTEGER PRIMARY KEY,
-                    files_organized INTEGER DEFAULT 0,
-                    duplicates_removed INTEGER DEFAULT 0,
-                    quests_completed INTEGER DEFAULT 0,
-                    total_xp_earned INTEGER DEFAULT 0,
-                    streak_days INTEGER DEFAULT 0,
-                    folders_cleaned INTEGER DEFAULT 0,
-                    space_freed INTEGER DEFAULT 0
-                )
-            """)
-            
-            conn.commit()
+            self._migrate_user_badges(cursor)
+            self._migrate_quest_timestamps(cursor)
+            self._migrate_daily_quest_count(cursor)
             
             # Initialize default user if not exists
             self._init_default_user(cursor)
@@ -137,14 +316,66 @@ class DatabaseManager:
             conn.commit()
             
             logger.info("Database initialized successfully")
+        
+        self._invalidate_user_cache()
+    
+    def _migrate_user_badges(self, cursor):
+        """Move badges from the old users.badges JSON column into user_badges"""
+        cursor.execute("PRAGMA table_info(users)")
+        if "badges" not in {name for _, name, *_ in cursor.fetchall()}:
+            return
+        
+        cursor.execute("SELECT id, badges FROM users")
+        cursor.executemany(
+            "INSERT OR IGNORE INTO user_badges (user_id, badge_id) VALUES (?, ?)",
+            [
+                (user_id, badge_id)
+                for user_id, badges in cursor.fetchall()
+                for badge_id in json.loads(badges or "[]")
+            ]
+        )
+        cursor.execute("ALTER TABLE users DROP COLUMN badges")
+    
+    def _migrate_quest_timestamps(self, cursor):
+        """Convert ISO-8601 quest timestamps from older databases to epoch seconds"""
+        # deadline/created_at were written from naive local datetimes, while
+        # completed_at came from CURRENT_TIMESTAMP and is already UTC.
+        # Fractions are cut off first, as strftime would round them up.
+        cursor.execute("""
+            UPDATE quests SET
+                deadline = CASE WHEN typeof(deadline) = 'text'
+                    THEN CAST(strftime('%s', substr(deadline, 1, 19), 'utc') AS INTEGER)
+                    ELSE deadline END,
+                created_at = CASE WHEN typeof(created_at) = 'text'
+                    THEN CAST(strftime('%s', substr(created_at, 1, 19), 'utc') AS INTEGER)
+                    ELSE created_at END,
+                completed_at = CASE WHEN typeof(completed_at) = 'text'
+                    THEN CAST(strftime('%s', substr(completed_at, 1, 19)) AS INTEGER)
+                    ELSE completed_at END
+            WHERE typeof(deadline) = 'text' OR typeof(created_at) = 'text'
+                OR typeof(completed_at) = 'text'
+        """)
+    
+    def _migrate_daily_quest_count(self, cursor):
+        """Add user_stats.daily_quests_completed to older databases, counted from quests"""
+        cursor.execute("PRAGMA table_info(user_stats)")
+        if "daily_quests_completed" in {name for _, name, *_ in cursor.fetchall()}:
+            return
+        
+        cursor.execute("ALTER TABLE user_stats ADD COLUMN daily_quests_completed INTEGER DEFAULT 0")
+        cursor.execute("""
+            UPDATE user_stats SET daily_quests_completed = (
+                SELECT COUNT(*) FROM quests WHERE category = 'daily' AND status = 'completed'
+            )
+        """)
     
     def _init_default_user(self, cursor):
         """Initialize default user if none exists"""
         cursor.execute("SELECT COUNT(*) FROM users")
         if cursor.fetchone()[0] == 0:
             cursor.execute("""
-                INSERT INTO users (id, level, xp, total_xp, streak, badges, completed_quests)
-                VALUES (1, 1, 0, 0, 0, '[]', 0)
+                INSERT INTO users (id, level, xp, total_xp, streak, completed_quests)
+                VALUES (1, 1, 0, 0, 0, 0)
             """)
             
             cursor.execute("""
@@ -164,11 +395,10 @@ class DatabaseManager:
             ("quest_completer", "Quest Completer", "Complete 100 quests", "Finish 100 quests total")
         ]
         
-        for badge_id, name, description, requirements in badges:
-            cursor.execute("""
-                INSERT OR IGNORE INTO badges (id, name, description, requirements)
-                VALUES (?, ?, ?, ?)
-            """, (badge_id, name, description, requirements))
+        cursor.executemany("""
+            INSERT OR IGNORE INTO badges (id, name, description, requirements)
+            VALUES (?, ?, ?, ?)
+        """, badges)
     
     def _init_default_achievements(self, cursor):
         """Initialize default achievements"""
@@ -180,27 +410,55 @@ class DatabaseManager:
             ("storage_saver", "Storage Saver", "Free up 1GB of space", "fas fa-hdd", 1024, 750)
         ]
         
-        for achievement_id, name, description, icon, target, xp_reward in achievements:
-            cursor.execute("""
-                INSERT OR IGNORE INTO achievements (id, name, description, icon, target, xp_reward)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (achievement_id, name, description, icon, target, xp_reward))
+        cursor.executemany("""
+            INSERT OR IGNORE INTO achievements (id, name, description, icon, target, xp_reward)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, achievements)
+    
+    @property
+    def user_data_version(self) -> int:
+        """Counter that changes whenever user data or stats are written"""
+        return self._cache_version
+    
+    def _invalidate_user_cache(self):
+        """Drop cached user data and stats after a write"""
+        with self._cache_lock:
+            self._cache_version += 1
+            self._user_cache = None
+            self._user_stats_cache = None
     
     def get_user_data(self) -> Dict[str, Any]:
         """Get current user data"""
+        with self._cache_lock:
+            user_data = self._user_cache
+            version = self._cache_version
+        
+        if user_data is None:
+            user_data = self._load_user_data()
+            with self._cache_lock:
+                if self._cache_version == version:
+                    self._user_cache = user_data
+        
+        # Callers get their own copy to modify
+        return {**user_data, "badges": list(user_data["badges"])}
+    
+    def _load_user_data(self) -> Dict[str, Any]:
+        """Read user data from the database"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM users WHERE id = 1")
+            cursor.execute(_GET_USER_SQL)
             row = cursor.fetchone()
             
             if row:
+                level, xp, total_xp, streak, completed_quests = row
+                cursor.execute(_GET_USER_BADGES_SQL)
                 return {
-                    "level": row["level"],
-                    "xp": row["xp"],
-                    "totalXp": row["total_xp"],
-                    "streak": row["streak"],
-                    "badges": json.loads(row["badges"]),
-                    "completedQuests": row["completed_quests"]
+                    "level": level,
+                    "xp": xp,
+                    "totalXp": total_xp,
+                    "streak": streak,
+                    "badges": [badge_id for badge_id, in cursor],
+                    "completedQuests": completed_quests
                 }
             else:
                 return {
@@ -212,107 +470,162 @@ class DatabaseManager:
                     "completedQuests": 0
                 }
     
+    def get_last_active_day(self) -> Optional[int]:
+        """Local day number (days since 1970-01-01) the user was last active; None before their first visit"""
+        with self.get_connection() as conn:
+            row = conn.execute(_GET_LAST_ACTIVE_DAY_SQL).fetchone()
+        return row[0] if row else None
+    
     def update_user_data(self, user_data: Dict[str, Any]):
         """Update user data"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
             
-            # Calculate level based on total XP
-            total_xp = user_data.get("totalXp", 0)
-            level = max(1, int(total_xp / 100) + 1)
-            xp_for_current_level = total_xp % 100
+            # Level and in-level XP are derived from total XP in SQL
+            cursor.execute(_UPDATE_USER_SQL, {
+                "total_xp": user_data.get("totalXp", 0),
+                "streak": user_data.get("streak", 0),
+                "completed_quests": user_data.get("completedQuests", 0)
+            })
             
-            cursor.execute("""
-                UPDATE users SET 
-                    level = ?, 
-                    xp = ?, 
-                    total_xp = ?, 
-                    streak = ?, 
-                    badges = ?, 
-                    completed_quests = ?,
-                    last_active = CURRENT_TIMESTAMP
-                WHERE id = 1
-            """, (
-                level,
-                xp_for_current_level,
-                total_xp,
-                user_data.get("streak", 0),
-                json.dumps(user_data.get("badges", [])),
-                user_data.get("completedQuests", 0)
-            ))
+            # Replace the badge set; rowid order keeps the order they were given in
+            cursor.execute("DELETE FROM user_badges WHERE user_id = 1")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO user_badges (user_id, badge_id) VALUES (1, ?)",
+                [(badge_id,) for badge_id in user_data.get("badges", [])]
+            )
             
             conn.commit()
+        
+        self._invalidate_user_cache()
+    
+    def add_user_badges(self, badge_ids: Iterable[str]) -> List[str]:
+        """
+        Add badges to the user, leaving the ones already earned untouched, and
+        return the ids that were actually added
+        """
+        badge_ids = list(badge_ids)
+        if not badge_ids:
+            return []
+        
+        added = []
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            # An ignored insert returns no row, so a badge another request
+            # stored first isn't reported as new twice
+            for badge_id in badge_ids:
+                cursor.execute(_ADD_USER_BADGE_SQL, (badge_id,))
+                added.extend(row[0] for row in cursor.fetchall())
+            conn.commit()
+        
+        self._invalidate_user_cache()
+        return added
     
     def award_xp(self, xp_amount: int):
         """Award XP to user"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE users SET 
-                    xp = xp + ?,
-                    total_xp = total_xp + ?
-                WHERE id = 1
-            """, (xp_amount, xp_amount))
-            
-            # Update level based on new total XP
-            cursor.execute("SELECT total_xp FROM users WHERE id = 1")
-            total_xp = cursor.fetchone()["total_xp"]
-            new_level = max(1, int(total_xp / 100) + 1)
-            xp_for_current_level = total_xp % 100
-            
-            cursor.execute("""
-                UPDATE users SET level = ?, xp = ? WHERE id = 1
-            """, (new_level, xp_for_current_level))
+            cursor.execute(_AWARD_XP_SQL, {"amount": xp_amount})
+            cursor.fetchall()  # the statement only completes once RETURNING rows are drained
             
             conn.commit()
+        
+        self._invalidate_user_cache()
     
     def get_user_stats(self) -> Dict[str, int]:
         """Get user statistics"""
+        with self._cache_lock:
+            user_stats = self._user_stats_cache
+            version = self._cache_version
+        
+        if user_stats is None:
+            user_stats = self._load_user_stats()
+            with self._cache_lock:
+                if self._cache_version == version:
+                    self._user_stats_cache = user_stats
+        
+        return dict(user_stats)
+    
+    def _load_user_stats(self) -> Dict[str, int]:
+        """Read user statistics from the database"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM user_stats WHERE id = 1")
+            cursor.execute("""
+                SELECT files_organized, duplicates_removed, quests_completed,
+                       daily_quests_completed
+                FROM user_stats WHERE id = 1
+            """)
             row = cursor.fetchone()
             
             if row:
+                files_organized, duplicates_removed, quests_completed, daily_quests_completed = row
                 return {
-                    "filesOrganized": row["files_organized"],
-                    "duplicatesRemoved": row["duplicates_removed"],
-                    "questsCompleted": row["quests_completed"]
+                    "filesOrganized": files_organized,
+                    "duplicatesRemoved": duplicates_removed,
+                    "questsCompleted": quests_completed,
+                    "dailyQuestsCompleted": daily_quests_completed
                 }
             else:
                 return {
                     "filesOrganized": 0,
                     "duplicatesRemoved": 0,
-                    "questsCompleted": 0
+                    "questsCompleted": 0,
+                    "dailyQuestsCompleted": 0
                 }
     
     def update_user_stats(self, **kwargs):
         """Update user statistics"""
+        keys = tuple(key for key in kwargs if key in self._STAT_COLS)
+        if not keys:
+            return
+        
+        sql = self._stat_update_sql.get(keys)
+        if sql is None:
+            sql = "UPDATE user_stats SET " + ", ".join(
+                f"{column} = {column} + ?" for column in map(self._STAT_COLS.__getitem__, keys)
+            ) + " WHERE id = 1"
+            self._stat_update_sql[keys] = sql
+        
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            for key, value in kwargs.items():
-                if key in ["filesOrganized", "duplicatesRemoved", "questsCompleted"]:
-                    db_key = key.replace("O", "_o").replace("R", "_r").replace("C", "_c").lower()
-                    cursor.execute(f"""
-                        UPDATE user_stats SET {db_key} = {db_key} + ? WHERE id = 1
-                    """, (value,))
-            
+            conn.execute(sql, [kwargs[key] for key in keys])
             conn.commit()
+        
+        self._invalidate_user_cache()
     
     def add_activity(self, activity: Dict[str, Any]):
         """Add activity entry"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO activity (type, description, xp, timestamp)
-                VALUES (?, ?, ?, ?)
-            """, (
-                activity["type"],
-                activity["description"],
-                activity["xp"],
-                activity.get("timestamp", datetime.now().isoformat())
-            ))
+            if "timestamp" in activity:
+                cursor.execute(_ADD_ACTIVITY_SQL, (
+                    activity["type"],
+                    activity["description"],
+                    activity["xp"],
+                    activity["timestamp"]
+                ))
+            else:
+                cursor.execute(_ADD_ACTIVITY_NOW_SQL, (
+                    activity["type"],
+                    activity["description"],
+                    activity["xp"]
+                ))
+            conn.commit()
+    
+    def add_activities(self, activities: Iterable[Dict[str, Any]]):
+        """Add several activity entries in one transaction"""
+        rows = [
+            (activity["type"], activity["description"], activity["xp"], activity.get("timestamp"))
+            for activity in activities
+        ]
+        if not rows:
+            return
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(_ADD_ACTIVITIES_SQL, rows)
             conn.commit()
     
     def get_recent_activity(self, limit: int = 10) -> List[Dict[str, Any]]:
@@ -320,77 +633,123 @@ class DatabaseManager:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT * FROM activity 
+                SELECT type, description, xp, timestamp FROM activity 
                 ORDER BY timestamp DESC 
                 LIMIT ?
             """, (limit,))
             
-            activities = []
-            for row in cursor.fetchall():
-                activities.append({
-                    "type": row["type"],
-                    "description": row["description"],
-                    "xp": row["xp"],
-                    "timestamp": row["timestamp"]
-                })
-            
-            return activities
+            return [
+                {
+                    "type": activity_type,
+                    "description": description,
+                    "xp": xp,
+                    "timestamp": timestamp
+                }
+                for activity_type, description, xp, timestamp in cursor
+            ]
+    
+    @staticmethod
+    def _quest_row(quest: Quest) -> tuple:
+        """Parameters for _SAVE_QUEST_SQL"""
+        return (
+            quest.id, quest.title, quest.description, quest.type.value,
+            quest.difficulty.value, quest.xp_reward, quest.status.value,
+            quest.category, quest.progress, quest.target,
+            int(quest.deadline.timestamp()) if quest.deadline else None,
+            quest.icon, json.dumps(quest.requirements),
+            int(quest.created_at.timestamp()), 
+            int(quest.completed_at.timestamp()) if quest.completed_at else None
+        )
     
     def save_quest(self, quest: Quest):
         """Save or update a quest"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO quests 
-                (id, title, description, type, difficulty, xp_reward, status, category, 
-                 progress, target, deadline, icon, requirements, created_at, completed_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                quest.id, quest.title, quest.description, quest.type.value,
-                quest.difficulty.value, quest.xp_reward, quest.status.value,
-                quest.category, quest.progress, quest.target,
-                quest.deadline.isoformat() if quest.deadline else None,
-                quest.icon, json.dumps(quest.requirements),
-                quest.created_at.isoformat(), 
-                quest.completed_at.isoformat() if quest.completed_at else None
-            ))
+            cursor.execute(_SAVE_QUEST_SQL, self._quest_row(quest))
+            conn.commit()
+    
+    def save_quests(self, quests: Iterable[Quest]):
+        """Save or update several quests in one transaction"""
+        rows = [self._quest_row(quest) for quest in quests]
+        if not rows:
+            return
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(_SAVE_QUEST_SQL, rows)
             conn.commit()
     
     def get_quests_by_category(self, category: str) -> List[Dict[str, Any]]:
         """Get quests by category"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # created_at has one-second resolution; rowid keeps newest-first among ties
             cursor.execute("""
-                SELECT * FROM quests WHERE category = ? ORDER BY created_at DESC
+                SELECT id, title, description, type, difficulty, xp_reward, status,
+                       progress, target, deadline, icon
+                FROM quests WHERE category = ? ORDER BY created_at DESC, rowid DESC
             """, (category,))
-            
-            quests = []
-            for row in cursor.fetchall():
-                quests.append({
-                    "id": row["id"],
-                    "title": row["title"],
-                    "description": row["description"],
-                    "type": row["type"],
-                    "difficulty": row["difficulty"],
-                    "xpReward": row["xp_reward"],
-                    "status": row["status"],
-                    "progress": row["progress"],
-                    "target": row["target"],
-                    "deadline": row["deadline"],
-                    "icon": row["icon"]
-                })
-            
-            return quests
+            return self._quest_dicts(cursor)
+    
+    def get_active_quests(self, category: str, since_iso: str) -> List[Dict[str, Any]]:
+        """Get quests in a category that aren't completed and are due on or after since_iso"""
+        since = int(datetime.fromisoformat(since_iso).timestamp())
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, title, description, type, difficulty, xp_reward, status,
+                       progress, target, deadline, icon
+                FROM quests
+                WHERE category = ? AND status IS NOT 'completed' AND deadline >= ?
+                ORDER BY created_at DESC, rowid DESC
+            """, (category, since))
+            return self._quest_dicts(cursor)
+    
+    def get_quest_requirements(self) -> Dict[str, Dict[str, Any]]:
+        """Get the requirements of every quest that isn't completed, by quest id"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, requirements FROM quests WHERE status IS NOT 'completed'
+            """)
+            return {
+                quest_id: json.loads(requirements) if requirements else {}
+                for quest_id, requirements in cursor
+            }
+    
+    @staticmethod
+    def _quest_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+        """Convert quest rows selected in the get_quests_by_category column order"""
+        fromtimestamp = datetime.fromtimestamp
+        return [
+            {
+                "id": quest_id,
+                "title": title,
+                "description": description,
+                "type": quest_type,
+                "difficulty": difficulty,
+                "xpReward": xp_reward,
+                "status": status,
+                "progress": progress,
+                "target": target,
+                # Callers and the frontend expect ISO strings
+                "deadline": fromtimestamp(deadline).isoformat() if deadline is not None else None,
+                "icon": icon
+            }
+            for (quest_id, title, description, quest_type, difficulty, xp_reward,
+                 status, progress, target, deadline, icon) in cursor
+        ]
     
     def complete_quest(self, quest_id: str) -> bool:
-        """Mark quest as completed"""
+        """Mark quest as completed; False if it is unknown or already completed"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE quests SET 
                     status = 'completed',
-                    completed_at = CURRENT_TIMESTAMP
-                WHERE id = ?
+                    completed_at = CAST(strftime('%s', 'now') AS INTEGER)
+                WHERE id = ? AND status <> 'completed'
             """, (quest_id,))
             
             conn.commit()
@@ -400,48 +759,108 @@ class DatabaseManager:
         """Get all badges"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM badges")
+            cursor.execute("SELECT id, name, description, requirements, icon FROM badges")
             
-            badges = []
-            for row in cursor.fetchall():
-                badges.append({
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "requirements": row["requirements"],
-                    "icon": row["icon"]
-                })
-            
-            return badges
+            return [
+                {
+                    "id": badge_id,
+                    "name": name,
+                    "description": description,
+                    "requirements": requirements,
+                    "icon": icon
+                }
+                for badge_id, name, description, requirements, icon in cursor
+            ]
     
     def get_achievements(self) -> List[Dict[str, Any]]:
         """Get all achievements with progress"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM achievements")
-            
-            achievements = []
-            for row in cursor.fetchall():
-                achievements.append({
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "icon": row["icon"],
-                    "progress": row["progress"],
-                    "target": row["target"],
-                    "xpReward": row["xp_reward"],
-                    "completed": bool(row["completed"])
-                })
+            cursor.execute("""
+                SELECT id, name, description, icon, progress, target, xp_reward, completed
+                FROM achievements
+            """)
             
-            return achievements
+            _bool = bool  # closure lookup instead of a builtins lookup per row
+            return [
+                {
+                    "id": achievement_id,
+                    "name": name,
+                    "description": description,
+                    "icon": icon,
+                    "progress": progress,
+                    "target": target,
+                    "xpReward": xp_reward,
+                    "completed": _bool(completed)
+                }
+                for (achievement_id, name, description, icon, progress, target,
+                     xp_reward, completed) in cursor
+            ]
+    
+    def get_open_achievements(self) -> List["AchievementRow"]:
+        """Get the progress columns of every achievement not yet completed"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, progress, target, xp_reward FROM achievements WHERE NOT IFNULL(completed, FALSE)
+            """)
+            return [AchievementRow._make(row) for row in cursor]
     
     def update_achievement_progress(self, achievement_id: str, progress: int):
         """Update achievement progress"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE achievements 
-                SET progress = ?, completed = CASE WHEN progress >= target THEN TRUE ELSE FALSE END
-                WHERE id = ?
-            """, (progress, achievement_id))
+            cursor.execute(_UPDATE_ACHIEVEMENT_PROGRESS_SQL, {"progress": progress, "id": achievement_id})
+            conn.commit()
+    
+    def update_achievement_progress_bulk(self, updates: Iterable[Tuple[str, int]]):
+        """Update the progress of several (achievement_id, progress) pairs in one transaction"""
+        rows = [{"progress": progress, "id": achievement_id} for achievement_id, progress in updates]
+        if not rows:
+            return
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(_UPDATE_ACHIEVEMENT_PROGRESS_SQL, rows)
+            conn.commit()
+    
+    def get_cached_hashes(self, algo: str, keys: List[Tuple[int, int, int, int]]) -> Dict[Tuple[int, int], str]:
+        """
+        Look up cached file hashes by (dev, ino, size, mtime_ns) and return
+        the digests found, keyed by (dev, ino)
+        """
+        wanted = {(dev, ino): (size, mtime_ns) for dev, ino, size, mtime_ns in keys}
+        inodes = list(wanted)
+        cached = {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(inodes), _HASH_LOOKUP_CHUNK):
+                chunk = inodes[start:start + _HASH_LOOKUP_CHUNK]
+                params = [algo]
+                for dev, ino in chunk:
+                    params.extend((dev, ino))
+                cursor.execute(
+                    _GET_CACHED_HASHES_SQL.format(", ".join(["(?, ?)"] * len(chunk))),
+                    params
+                )
+                for dev, ino, size, mtime_ns, digest in cursor.fetchall():
+                    # A changed size or mtime means the file was rewritten
+                    if wanted[(dev, ino)] == (size, mtime_ns):
+                        cached[(dev, ino)] = digest
+        
+        return cached
+    
+    def save_hashes(self, algo: str, rows: List[Tuple[int, int, int, int, str]]):
+        """Store (dev, ino, size, mtime_ns, digest) file hashes in one transaction"""
+        if not rows:
+            return
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(
+                _SAVE_HASH_SQL,
+                [(dev, ino, algo, size, mtime_ns, digest) for dev, ino, size, mtime_ns, digest in rows]
+            )
             conn.commit()
@@ -1,19 +1,135 @@
 import os
+import sys
+import errno
+import stat
 import shutil
 import hashlib
+import heapq
+import itertools
+import operator
+from array import array
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import multiprocessing
+import threading
+import time
+from typing import Dict, List, Optional, Any, Tuple, Iterator, Iterable
 from datetime import datetime
 from pathlib import Path
 import json
-from collections import defaultdict
+from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-from models import FileInfo, DuplicateGroup, ScanResult, OrganizationRule, get_file_type, FileType
+from models import FileInfo, DuplicateGroup, ScanResult, OrganizationRule, FileType
+from database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
-class FileManager:
+# Content hash for duplicate detection. BLAKE2b ships with hashlib and hashes
+# faster than MD5 on 64-bit CPUs while staying collision resistant.
+HASH_ALGORITHM = "blake2b"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# hashlib releases the GIL while digesting, so threads overlap reads and hashing
+HASH_WORKERS = os.cpu_count() or 1
+
+# scan_folder walks each top-level subdirectory in its own process once a
+# folder has more than this many; smaller trees aren't worth the startup cost
+PARALLEL_SCAN_MIN_SUBDIRS = 4
+SCAN_WORKERS = os.cpu_count() or 1
+
+# A confirmed duplicate as (path, name, size, mtime); kept as a plain tuple
+# since only the files in duplicate groups ever need a datetime
+DuplicateRow = Tuple[str, str, int, float]
+
+# A scan's file table, followed by its file type counts and folder count
+ScanColumns = Tuple["FileTable", Dict[str, int], int]
+
+# Name comparison used when looking for a free file name; the default
+# filesystems on macOS and Windows ignore case
+_name_key = str.casefold if sys.platform in ("darwin", "win32") else str
+
+# How long get_folder_stats reuses a folder's scan before walking it again
+SCAN_CACHE_TTL = 60.0
+
+# Duplicate candidates are full-hashed in batches of about this many files,
+# cut at size boundaries, so groups can be reported as they're confirmed
+DUPLICATE_BATCH_SIZE = 256
+
+# Largest value SQLite can store in an INTEGER column; files whose inode
+# numbers exceed it are simply not cached
+_SQLITE_MAX_INT = (1 << 63) - 1
+
+# Window read at the start, middle and end of a file for its sampled
+# fingerprint; files no larger than three windows are hashed in full
+SAMPLE_WINDOW_SIZE = 64 * 1024
+SAMPLED_FINGERPRINT_MIN_SIZE = 3 * SAMPLE_WINDOW_SIZE
+
+# Bytes compared at the start of two same-size files before hashing them
+HEAD_COMPARE_SIZE = SAMPLE_WINDOW_SIZE
+
+# Read-ahead and page cache hints are POSIX only (not on macOS or Windows)
+_HAVE_FADVISE = hasattr(os, "posix_fadvise")
+
+# Each hashing thread reads into one preallocated buffer instead of
+# allocating a fresh bytes object per chunk
+_thread_local = threading.local()
+
+def _read_buffer() -> memoryview:
+    """Return the calling thread's reusable read buffer"""
+    buffer = getattr(_thread_local, "read_buffer", None)
+    if buffer is None:
+        buffer = _thread_local.read_buffer = memoryview(bytearray(HASH_CHUNK_SIZE))
+    return buffer
+
+class FileTable:
+    """
+    Scanned files as parallel columns: paths, plus sizes, mtimes and ctimes
+    in typed arrays. Only the handful of rows a scan reports are ever turned
+    into FileInfo objects, so the rest never become one object per file.
+    """
+    
     def __init__(self):
+        self.paths: List[str] = []
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.ctimes = array("d")
+    
+    def __len__(self) -> int:
+        return len(self.paths)
+    
+    def append(self, path: str, st: os.stat_result):
+        """Add a file from its path and stat result"""
+        self.paths.append(path)
+        self.sizes.append(st.st_size)
+        self.mtimes.append(st.st_mtime)
+        self.ctimes.append(st.st_ctime)
+    
+    def extend(self, other: "FileTable"):
+        """Append all rows of another table"""
+        self.paths.extend(other.paths)
+        self.sizes.extend(other.sizes)
+        self.mtimes.extend(other.mtimes)
+        self.ctimes.extend(other.ctimes)
+    
+    def row(self, i: int) -> Tuple[str, int, float, float]:
+        """Return (path, size, mtime, ctime) for row i"""
+        return self.paths[i], self.sizes[i], self.mtimes[i], self.ctimes[i]
+    
+    def largest(self, n: int) -> List[int]:
+        """Indices of the n largest files, largest first"""
+        return heapq.nlargest(n, range(len(self.paths)), key=self.sizes.__getitem__)
+    
+    def oldest(self, n: int) -> List[int]:
+        """Indices of the n least recently modified files, oldest first"""
+        return heapq.nsmallest(n, range(len(self.paths)), key=self.mtimes.__getitem__)
+
+class FileManager:
+    _SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+    
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        # Optional; when given, file hashes are cached across scans
+        self.db = db_manager
+        
         self.supported_extensions = {
             'Images': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp', '.ico', '.tiff'],
             'Documents': ['.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt', '.pages'],
@@ -26,6 +142,16 @@ class FileManager:
             'Executables': ['.exe', '.msi', '.dmg', '.pkg', '.deb', '.rpm', '.app'],
         }
         
+        # Recent scans for get_folder_stats: resolved path -> (time, scan result)
+        self._scan_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        
+        # Flattened once so classifying a file is a single dict lookup
+        self._ext_to_type = {
+            ext: category
+            for category, extensions in self.supported_extensions.items()
+            for ext in extensions
+        }
+        
         # Common folder mappings for different OS
         self.common_folders = {
             'downloads': self._get_downloads_folder(),
@@ -67,41 +193,190 @@ class FileManager:
         return str(home)
     
     def _get_file_hash(self, file_path: str) -> Optional[str]:
-        """Calculate MD5 hash of a file"""
+        """Calculate the content hash of a file"""
         try:
-            hash_md5 = hashlib.md5()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            file_hash = hashlib.new(HASH_ALGORITHM)
+            buffer = _read_buffer()
+            fd = os.open(file_path, os.O_RDONLY)
+            with open(fd, "rb", buffering=0) as f:
+                if _HAVE_FADVISE:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                while True:
+                    n = f.readinto(buffer)
+                    if not n:
+                        break
+                    file_hash.update(buffer[:n])
+                # Each file is read once per scan, so don't let it push
+                # other data out of the page cache
+                if _HAVE_FADVISE:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            return file_hash.hexdigest()
         except Exception as e:
             logger.error(f"Failed to calculate hash for {file_path}: {e}")
             return None
     
-    def _get_file_info(self, file_path: str) -> Optional[FileInfo]:
-        """Get detailed information about a file"""
+    def _get_sampled_fingerprint(self, file_path: str, size: int) -> Optional[str]:
+        """Hash the first, middle and last windows of a large file"""
         try:
-            path_obj = Path(file_path)
-            if not path_obj.exists() or not path_obj.is_file():
-                return None
-            
-            stat = path_obj.stat()
+            fingerprint = hashlib.new(HASH_ALGORITHM)
+            with open(file_path, "rb") as f:
+                for offset in (0, size // 2 - SAMPLE_WINDOW_SIZE // 2, size - SAMPLE_WINDOW_SIZE):
+                    f.seek(offset)
+                    fingerprint.update(f.read(SAMPLE_WINDOW_SIZE))
+            return fingerprint.hexdigest()
+        except Exception as e:
+            logger.error(f"Failed to calculate fingerprint for {file_path}: {e}")
+            return None
+    
+    def _list_dir(self, path: str) -> List[os.DirEntry]:
+        """List the entries of a single directory, skipping symlinks"""
+        try:
+            with os.scandir(path) as it:
+                return [entry for entry in it if not entry.is_symlink()]
+        except OSError as e:
+            logger.warning(f"Cannot access {path}: {e}")
+            return []
+    
+    def _scandir_recursive(self, path: str) -> Iterator[os.DirEntry]:
+        """
+        Yield the files and directories under path, skipping symlinks.
+        A directory's entries come before those of its subdirectories.
+        """
+        # The listing is read up front so the directory handle is closed
+        # before recursing, rather than holding one open per level
+        entries = self._list_dir(path)
+        yield from entries
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from self._scandir_recursive(entry.path)
+    
+    def _classify_name(self, name: str) -> Tuple[str, str]:
+        """Return the lowercased extension of a file name and its file type"""
+        extension = os.path.splitext(name)[1].lower()
+        return extension, self._ext_to_type.get(extension, FileType.OTHER.value)
+    
+    def _hash_entries(self, executor: ThreadPoolExecutor, entries: List[os.DirEntry],
+                      algo: str, hash_entry) -> List[Optional[str]]:
+        """
+        Hash entries on the executor, reusing digests cached for files whose
+        size and mtime haven't changed since they were last hashed
+        """
+        keys = []
+        for entry in entries:
+            st = entry.stat()
+            keys.append((st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns))
+        
+        cached = {}
+        if self.db:
+            try:
+                cached = self.db.get_cached_hashes(
+                    algo, [key for key in keys if max(key) <= _SQLITE_MAX_INT]
+                )
+            except Exception as e:
+                logger.warning(f"Hash cache lookup failed: {e}")
+        
+        digests = [cached.get(key[:2]) for key in keys]
+        missing = [i for i, digest in enumerate(digests) if digest is None]
+        computed = executor.map(hash_entry, [entries[i] for i in missing])
+        for i, digest in zip(missing, computed):
+            digests[i] = digest
+        
+        if self.db:
+            try:
+                self.db.save_hashes(algo, [
+                    keys[i] + (digests[i],)
+                    for i in missing
+                    if digests[i] and max(keys[i]) <= _SQLITE_MAX_INT
+                ])
+            except Exception as e:
+                logger.warning(f"Failed to update hash cache: {e}")
+        
+        return digests
+    
+    def _get_file_info(self, entry: os.DirEntry, compute_hash: bool = False) -> Optional[FileInfo]:
+        """Get detailed information about a file from its directory entry"""
+        try:
+            # DirEntry caches the stat result, so callers that already
+            # checked the size don't pay for a second syscall
+            st = entry.stat()
+            extension, file_type = self._classify_name(entry.name)
             return FileInfo(
-                path=str(path_obj),
-                name=path_obj.name,
-                size=stat.st_size,
-                type=get_file_type(path_obj.suffix).value,
-                extension=path_obj.suffix.lower(),
-                modified=datetime.fromtimestamp(stat.st_mtime),
-                created=datetime.fromtimestamp(stat.st_ctime),
-                hash=self._get_file_hash(file_path)
+                path=entry.path,
+                name=entry.name,
+                size=st.st_size,
+                type=file_type,
+                extension=extension,
+                modified=datetime.fromtimestamp(st.st_mtime),
+                created=datetime.fromtimestamp(st.st_ctime),
+                hash=self._get_file_hash(entry.path) if compute_hash else None
             )
         except Exception as e:
-            logger.error(f"Failed to get file info for {file_path}: {e}")
+            logger.error(f"Failed to get file info for {entry.path}: {e}")
             return None
     
-    def scan_folder(self, folder_path: str) -> Dict[str, Any]:
-        """Scan a folder and return detailed analysis"""
+    def _file_info_from_row(self, path: str, size: int, mtime: float, ctime: float) -> FileInfo:
+        """Build a FileInfo from one FileTable row"""
+        name = os.path.basename(path)
+        extension, file_type = self._classify_name(name)
+        return FileInfo(
+            path=path,
+            name=name,
+            size=size,
+            type=file_type,
+            extension=extension,
+            modified=datetime.fromtimestamp(mtime),
+            created=datetime.fromtimestamp(ctime)
+        )
+    
+    def _scan_entries(self, entries: Iterable[os.DirEntry]) -> ScanColumns:
+        """Collect a file table, type counts and folder count for entries"""
+        table = FileTable()
+        # Files are tallied by raw extension and each distinct extension is
+        # classified once at the end, keeping the lookup out of the per-file loop
+        extension_counts = defaultdict(int)
+        folder_count = 0
+        
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    # The scan result never uses content hashes, so
+                    # only metadata is read here
+                    table.append(entry.path, entry.stat())
+                    extension_counts[os.path.splitext(entry.name)[1]] += 1
+                elif entry.is_dir():
+                    folder_count += 1
+            except PermissionError:
+                logger.warning(f"Permission denied accessing: {entry.path}")
+                continue
+            except Exception as e:
+                logger.error(f"Error processing {entry.path}: {e}")
+                continue
+        
+        file_types = defaultdict(int)
+        other = FileType.OTHER.value
+        for extension, count in extension_counts.items():
+            file_types[self._ext_to_type.get(extension.lower(), other)] += count
+        
+        return table, dict(file_types), folder_count
+    
+    def _scan_subdirs(self, subdirs: List[str]) -> List[ScanColumns]:
+        """Scan each subdirectory tree, in parallel processes when there are enough of them"""
+        if len(subdirs) > PARALLEL_SCAN_MIN_SUBDIRS and SCAN_WORKERS > 1:
+            try:
+                return list(_get_scan_pool().map(_scan_subtree, subdirs))
+            except Exception as e:
+                logger.warning(f"Parallel scan failed, scanning serially: {e}")
+                # A broken pool can't recover; the next scan starts a new one
+                shutdown_scan_pool(wait=False)
+        
+        return [self._scan_entries(self._scandir_recursive(subdir)) for subdir in subdirs]
+    
+    def scan_folder(self, folder_path: str, include_files: bool = False) -> Dict[str, Any]:
+        """
+        Scan a folder and return detailed analysis. With include_files the
+        result also has "files", a one-shot generator of every file's FileInfo
+        that the caller must consume and remove before serializing
+        """
         try:
             path_obj = Path(folder_path)
             
@@ -109,55 +384,55 @@ class FileManager:
             if folder_path.lower() in self.common_folders:
                 path_obj = Path(self.common_folders[folder_path.lower()])
             
-            if not path_obj.exists():
+            # One stat() answers both checks; Path.exists() and is_dir()
+            # would each issue their own
+            try:
+                root_mode = os.stat(path_obj).st_mode
+            except (FileNotFoundError, NotADirectoryError):
                 return {
                     "success": False,
                     "error": f"Folder does not exist: {folder_path}"
                 }
             
-            if not path_obj.is_dir():
+            if not stat.S_ISDIR(root_mode):
                 return {
                     "success": False,
                     "error": f"Path is not a directory: {folder_path}"
                 }
             
-            files = []
-            file_types = defaultdict(int)
-            total_size = 0
-            folder_count = 0
+            # Scan the top level here and each subdirectory tree separately,
+            # merging in walk order so the result matches a serial scan
+            top_level = self._list_dir(str(path_obj))
+            table, top_level_types, folder_count = self._scan_entries(top_level)
+            file_types = Counter(top_level_types)
             
-            # Scan directory recursively
-            for item in path_obj.rglob("*"):
-                try:
-                    if item.is_file():
-                        file_info = self._get_file_info(str(item))
-                        if file_info:
-                            files.append(file_info)
-                            file_types[file_info.type] += 1
-                            total_size += file_info.size
-                    elif item.is_dir():
-                        folder_count += 1
-                except PermissionError:
-                    logger.warning(f"Permission denied accessing: {item}")
-                    continue
-                except Exception as e:
-                    logger.error(f"Error processing {item}: {e}")
-                    continue
+            subdirs = [entry.path for entry in top_level if entry.is_dir(follow_symlinks=False)]
+            for sub_table, sub_types, sub_folders in self._scan_subdirs(subdirs):
+                table.extend(sub_table)
+                file_types.update(sub_types)
+                folder_count += sub_folders
             
-            # Sort files by size for largest files list
-            largest_files = sorted(files, key=lambda x: x.size, reverse=True)[:10]
+            # Only the top 10 are needed, so select their rows without
+            # sorting everything, then build FileInfo objects for just those
+            largest_files = [self._file_info_from_row(*table.row(i)) for i in table.largest(10)]
+            oldest_files = [self._file_info_from_row(*table.row(i)) for i in table.oldest(10)]
             
-            return ScanResult(
+            result = ScanResult(
                 path=str(path_obj),
-                total_files=len(files),
+                total_files=len(table),
                 total_folders=folder_count,
-                total_size=total_size,
+                total_size=sum(table.sizes),
                 file_types=dict(file_types),
                 largest_files=largest_files,
-                oldest_files=sorted(files, key=lambda x: x.modified)[:10],
+                oldest_files=oldest_files,
                 success=True
             ).__dict__
             
+            if include_files:
+                result["files"] = (self._file_info_from_row(*table.row(i)) for i in range(len(table)))
+            
+            return result
+            
         except Exception as e:
             logger.error(f"Failed to scan folder {folder_path}: {e}")
             return {
@@ -182,6 +457,9 @@ class FileManager:
             
             files_organized = 0
             errors = []
+            # Names already taken in each category folder, listed on first use
+            # so conflicts are resolved without probing the filesystem
+            folder_listings: Dict[str, set] = {}
             
             # Get all files in the directory
             for item in path_obj.iterdir():
@@ -189,7 +467,7 @@ class FileManager:
                     if not item.is_file():
                         continue
                     
-                    file_type = get_file_type(item.suffix).value
+                    file_type = self._classify_name(item.name)[1]
                     
                     # Check if this file type should be organized
                     if not rules.get(file_type, False):
@@ -197,21 +475,32 @@ class FileManager:
                     
                     # Create target folder if it doesn't exist
                     target_folder = path_obj / file_type
-                    target_folder.mkdir(exist_ok=True)
-                    
-                    # Move file to target folder
-                    target_path = target_folder / item.name
+                    listing = folder_listings.get(file_type)
+                    if listing is None:
+                        target_folder.mkdir(exist_ok=True)
+                        listing = folder_listings[file_type] = {
+                            _name_key(name) for name in os.listdir(target_folder)
+                        }
                     
                     # Handle name conflicts
+                    target_name = item.name
                     counter = 1
-                    original_target = target_path
-                    while target_path.exists():
-                        stem = original_target.stem
-                        suffix = original_target.suffix
-                        target_path = target_folder / f"{stem}_{counter}{suffix}"
+                    while _name_key(target_name) in listing:
+                        target_name = f"{item.stem}_{counter}{item.suffix}"
                         counter += 1
                     
-                    shutil.move(str(item), str(target_path))
+                    # Move file to target folder
+                    target_path = target_folder / target_name
+                    
+                    # The target is inside the source's own folder, so a plain
+                    # rename normally suffices; shutil.move copies across devices
+                    try:
+                        os.rename(item, target_path)
+                    except OSError as e:
+                        if e.errno != errno.EXDEV:
+                            raise
+                        shutil.move(str(item), str(target_path))
+                    listing.add(_name_key(target_name))
                     files_organized += 1
                     
                 except Exception as e:
@@ -219,6 +508,9 @@ class FileManager:
                     errors.append(error_msg)
                     logger.error(error_msg)
             
+            if files_organized:
+                self._scan_cache.clear()
+            
             return {
                 "success": True,
                 "filesOrganized": files_organized,
@@ -262,66 +554,158 @@ class FileManager:
                 "error": str(e)
             }
     
+    def _heads_match(self, pair: List[os.DirEntry]) -> bool:
+        """Compare the first HEAD_COMPARE_SIZE bytes of two same-size files"""
+        try:
+            with open(pair[0].path, "rb") as first, open(pair[1].path, "rb") as second:
+                return first.read(HEAD_COMPARE_SIZE) == second.read(HEAD_COMPARE_SIZE)
+        except Exception as e:
+            logger.error(f"Failed to compare {pair[0].path} and {pair[1].path}: {e}")
+            return False
+    
+    def _confirm_duplicates(self, executor: ThreadPoolExecutor, candidates: List[os.DirEntry]) -> Iterator[List[DuplicateRow]]:
+        """
+        Full-hash same-size candidates in batches, yielding each group of
+        identical files as soon as its batch is hashed
+        """
+        batch = []
+        for i, entry in enumerate(candidates):
+            batch.append(entry)
+            # Cut batches only between sizes so no group spans two of them
+            if (len(batch) >= DUPLICATE_BATCH_SIZE and
+                    (i + 1 == len(candidates) or
+                     candidates[i + 1].stat().st_size != entry.stat().st_size)):
+                yield from self._hash_batch(executor, batch)
+                batch = []
+        if batch:
+            yield from self._hash_batch(executor, batch)
+    
+    def _hash_batch(self, executor: ThreadPoolExecutor, batch: List[os.DirEntry]) -> Iterator[List[DuplicateRow]]:
+        """Yield the groups of files in batch that share a full-content hash"""
+        hash_groups = defaultdict(list)
+        digests = self._hash_entries(
+            executor, batch, HASH_ALGORITHM,
+            lambda entry: self._get_file_hash(entry.path)
+        )
+        for entry, digest in zip(batch, digests):
+            if digest:
+                st = entry.stat()
+                hash_groups[digest].append((entry.path, entry.name, st.st_size, st.st_mtime))
+        
+        for rows in hash_groups.values():
+            if len(rows) > 1:
+                yield rows
+    
+    def iter_duplicates(self, scan_path: str) -> Iterator[Dict[str, Any]]:
+        """Yield duplicate file groups in the given path as each one is confirmed"""
+        path_obj = Path(scan_path)
+        
+        # Handle common folder shortcuts and root path
+        if scan_path == "/":
+            path_obj = Path.home()
+        elif scan_path.lower() in self.common_folders:
+            path_obj = Path(self.common_folders[scan_path.lower()])
+        
+        if not path_obj.exists():
+            logger.error(f"Path does not exist: {scan_path}")
+            return
+        
+        # Pass 1: group files by size; a file with a unique size cannot
+        # have a duplicate, so it is never read
+        size_groups = defaultdict(list)
+        for entry in self._scandir_recursive(str(path_obj)):
+            try:
+                if entry.is_file():
+                    size = entry.stat().st_size
+                    if size > 0:  # Skip empty files
+                        size_groups[size].append(entry)
+            except (PermissionError, OSError) as e:
+                logger.warning(f"Cannot access {entry.path}: {e}")
+                continue
+            except Exception as e:
+                logger.error(f"Error processing {entry.path}: {e}")
+                continue
+        
+        group_count = 0
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+            # A size shared by exactly two files is settled by comparing
+            # their first bytes: a mismatch rules the pair out without
+            # hashing, and a match covering the whole file confirms it
+            pairs = [entries for entries in size_groups.values() if len(entries) == 2]
+            head_matches = dict(zip(
+                map(id, pairs),
+                executor.map(self._heads_match, pairs)
+            ))
+            
+            confirmed_pairs = []
+            candidates = []
+            sampled = []
+            for size, entries in size_groups.items():
+                if len(entries) < 2:
+                    continue
+                if len(entries) == 2:
+                    if not head_matches[id(entries)]:
+                        continue
+                    if size <= HEAD_COMPARE_SIZE:
+                        confirmed_pairs.append([
+                            (entry.path, entry.name, size, entry.stat().st_mtime)
+                            for entry in entries
+                        ])
+                        continue
+                if size <= SAMPLED_FINGERPRINT_MIN_SIZE:
+                    candidates.extend(entries)
+                else:
+                    sampled.extend(entries)
+            del size_groups, pairs, head_matches
+            
+            # Small files are confirmed first, so their groups go out
+            # before the large files are sampled
+            groups = itertools.chain(confirmed_pairs, self._confirm_duplicates(executor, candidates))
+            
+            # Pass 2: split large same-size files by a sampled fingerprint,
+            # so only those whose samples also match are read in full
+            def large_file_groups():
+                fingerprints = self._hash_entries(
+                    executor, sampled, f"{HASH_ALGORITHM}-sampled",
+                    lambda entry: self._get_sampled_fingerprint(entry.path, entry.stat().st_size)
+                )
+                fingerprint_groups = defaultdict(list)
+                for entry, fingerprint in zip(sampled, fingerprints):
+                    if fingerprint:
+                        fingerprint_groups[(entry.stat().st_size, fingerprint)].append(entry)
+                
+                # Pass 3: confirm candidates with a full-content hash
+                yield from self._confirm_duplicates(executor, [
+                    entry
+                    for group in fingerprint_groups.values() if len(group) > 1
+                    for entry in group
+                ])
+            
+            for rows in itertools.chain(groups, large_file_groups()):
+                # Sort files by modification date (oldest first)
+                rows.sort(key=operator.itemgetter(3))
+                group_count += 1
+                
+                yield {
+                    "id": str(group_count),
+                    "name": rows[0][1],
+                    "files": [
+                        {
+                            "id": str(i),
+                            "path": path,
+                            "size": size,
+                            "modified": datetime.fromtimestamp(mtime).isoformat()
+                        }
+                        for i, (path, _, size, mtime) in enumerate(rows)
+                    ]
+                }
+        
+        logger.info(f"Found {group_count} groups of duplicate files")
+    
     def find_duplicates(self, scan_path: str) -> List[Dict[str, Any]]:
         """Find duplicate files in the given path"""
         try:
-            path_obj = Path(scan_path)
-            
-            # Handle common folder shortcuts and root path
-            if scan_path == "/":
-                path_obj = Path.home()
-            elif scan_path.lower() in self.common_folders:
-                path_obj = Path(self.common_folders[scan_path.lower()])
-            
-            if not path_obj.exists():
-                logger.error(f"Path does not exist: {scan_path}")
-                return []
-            
-            # Dictionary to group files by hash
-            hash_groups = defaultdict(list)
-            
-            # Scan for files and calculate hashes
-            for item in path_obj.rglob("*"):
-                try:
-                    if item.is_file() and item.stat().st_size > 0:  # Skip empty files
-                        file_info = self._get_file_info(str(item))
-                        if file_info and file_info.hash:
-                            hash_groups[file_info.hash].append(file_info)
-                except (PermissionError, OSError) as e:
-                    logger.warning(f"Cannot access {item}: {e}")
-                    continue
-                except Exception as e:
-                    logger.error(f"Error processing {item}: {e}")
-                    continue
-            
-            # Filter groups with more than one file (duplicates)
-            duplicate_groups = []
-            group_id = 1
-            
-            for file_hash, file_list in hash_groups.items():
-                if len(file_list) > 1:
-                    # Sort files by modification date (oldest first)
-                    sorted_files = sorted(file_list, key=lambda x: x.modified)
-                    
-                    duplicate_group = {
-                        "id": str(group_id),
-                        "name": sorted_files[0].name,
-                        "files": [
-                            {
-                                "id": str(i),
-                                "path": file_info.path,
-                                "size": file_info.size,
-                                "modified": file_info.modified.isoformat()
-                            }
-                            for i, file_info in enumerate(sorted_files)
-                        ]
-                    }
-                    duplicate_groups.append(duplicate_group)
-                    group_id += 1
-            
-            logger.info(f"Found {len(duplicate_groups)} groups of duplicate files")
-            return duplicate_groups
-            
+            return list(self.iter_duplicates(scan_path))
         except Exception as e:
             logger.error(f"Failed to find duplicates in {scan_path}: {e}")
             return []
@@ -335,20 +719,25 @@ class FileManager:
             
             for file_path in file_paths:
                 try:
-                    path_obj = Path(file_path)
-                    if path_obj.exists() and path_obj.is_file():
-                        file_size = path_obj.stat().st_size
-                        path_obj.unlink()
-                        deleted_count += 1
-                        total_size_freed += file_size
-                        logger.info(f"Deleted file: {file_path}")
-                    else:
+                    # One lstat gives existence, type and size together
+                    st = os.lstat(file_path)
+                    if not stat.S_ISREG(st.st_mode):
                         errors.append(f"File not found: {file_path}")
+                        continue
+                    os.unlink(file_path)
+                    deleted_count += 1
+                    total_size_freed += st.st_size
+                    logger.info(f"Deleted file: {file_path}")
+                except FileNotFoundError:
+                    errors.append(f"File not found: {file_path}")
                 except Exception as e:
                     error_msg = f"Failed to delete {file_path}: {str(e)}"
                     errors.append(error_msg)
                     logger.error(error_msg)
             
+            if deleted_count:
+                self._scan_cache.clear()
+            
             return {
                 "success": True,
                 "deletedCount": deleted_count,
@@ -368,23 +757,26 @@ class FileManager:
         if size_bytes == 0:
             return "0 B"
         
-        size_names = ["B", "KB", "MB", "GB", "TB"]
+        # bit_length() // 10 is floor(log1024(size)) for positive integers
         size_index = 0
-        size = float(size_bytes)
-        
-        while size >= 1024.0 and size_index < len(size_names) - 1:
-            size /= 1024.0
-            size_index += 1
+        if size_bytes > 0:
+            size_index = min((size_bytes.bit_length() - 1) // 10, len(self._SIZE_NAMES) - 1)
         
-        return f"{size:.1f} {size_names[size_index]}"
+        return f"{size_bytes / (1 << (size_index * 10)):.1f} {self._SIZE_NAMES[size_index]}"
     
     def get_folder_stats(self, folder_path: str) -> Dict[str, Any]:
         """Get comprehensive statistics for a folder"""
         try:
-            scan_result = self.scan_folder(folder_path)
-            
-            if not scan_result.get("success"):
-                return scan_result
+            cache_key = os.path.realpath(self.common_folders.get(folder_path.lower(), folder_path))
+            cached = self._scan_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < SCAN_CACHE_TTL:
+                scan_result = cached[1]
+            else:
+                scan_result = self.scan_folder(folder_path)
+                
+                if not scan_result.get("success"):
+                    return scan_result
+                self._scan_cache[cache_key] = (time.monotonic(), scan_result)
             
             stats = {
                 "totalFiles": scan_result["total_files"],
@@ -412,3 +804,33 @@ class FileManager:
                 "success": False,
                 "error": str(e)
             }
+
+
+_scan_pool: Optional[ProcessPoolExecutor] = None
+_scan_pool_lock = threading.Lock()
+
+def _get_scan_pool() -> ProcessPoolExecutor:
+    """The process pool shared by all scans, started on first use"""
+    global _scan_pool
+    with _scan_pool_lock:
+        if _scan_pool is None:
+            # spawn rather than fork: the server is multithreaded, and a forked
+            # child can inherit a lock another thread held at fork time
+            _scan_pool = ProcessPoolExecutor(
+                max_workers=SCAN_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _scan_pool
+
+def shutdown_scan_pool(wait: bool = True):
+    """Stop the shared scan pool (call on shutdown)"""
+    global _scan_pool
+    with _scan_pool_lock:
+        pool, _scan_pool = _scan_pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+
+def _scan_subtree(path: str) -> ScanColumns:
+    """Process pool worker for scan_folder; scans one subdirectory tree"""
+    file_manager = FileManager()
+    return file_manager._scan_entries(file_manager._scandir_recursive(path))
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 import uvicorn
@@ -9,7 +10,7 @@ import os
 import json
 
 from database import DatabaseManager
-from file_operations import FileManager
+from file_operations import FileManager, shutdown_scan_pool
 from ai_classifier import AIClassifier
 from quest_engine import QuestEngine
 from rewards_system import RewardsSystem
@@ -30,12 +31,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize components
-db_manager = DatabaseManager()
-file_manager = FileManager()
-ai_classifier = AIClassifier()
-quest_engine = QuestEngine(db_manager)
-rewards_system = RewardsSystem(db_manager)
+# Components are built in startup_event, not at import: the folder scan's
+# spawned workers re-import this module as __mp_main__ and must not open
+# database connections or start timers of their own
+db_manager: Optional[DatabaseManager] = None
+file_manager: Optional[FileManager] = None
+ai_classifier: Optional[AIClassifier] = None
+quest_engine: Optional[QuestEngine] = None
+rewards_system: Optional[RewardsSystem] = None
 
 # Pydantic models for request/response
 class UserData(BaseModel):
@@ -65,14 +68,29 @@ class Activity(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and components on startup"""
+    global db_manager, file_manager, ai_classifier, quest_engine, rewards_system
     try:
+        db_manager = DatabaseManager()
+        file_manager = FileManager(db_manager)
+        ai_classifier = AIClassifier()
+        quest_engine = QuestEngine(db_manager)
+        rewards_system = RewardsSystem(db_manager)
+        
         db_manager.init_database()
         quest_engine.initialize_quests()
+        rewards_system.schedule_force_check()
         logger.info("Backend started successfully")
     except Exception as e:
         logger.error(f"Startup failed: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release database connections on shutdown"""
+    rewards_system.close()
+    shutdown_scan_pool()
+    db_manager.close_all()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -90,10 +108,13 @@ async def get_user_data():
         return UserData().dict()
 
 @app.put("/api/user")
-async def update_user_data(user_data: UserData):
+async def update_user_data(user_data: UserData, background_tasks: BackgroundTasks):
     """Update user data"""
     try:
         db_manager.update_user_data(user_data.dict())
+        
+        # The streak may have moved
+        background_tasks.add_task(rewards_system.check_rewards, 0, {"streak"})
         return {"success": True}
     except Exception as e:
         logger.error(f"Failed to update user data: {e}")
@@ -148,7 +169,7 @@ async def complete_quest(quest_id: str, background_tasks: BackgroundTasks):
             )
             
             # Check for new badges/achievements
-            new_rewards = rewards_system.check_rewards(result["xpGained"])
+            new_rewards = rewards_system.check_rewards(result["xpGained"], {"questsCompleted"})
             result.update(new_rewards)
         
         return result
@@ -157,15 +178,17 @@ async def complete_quest(quest_id: str, background_tasks: BackgroundTasks):
         raise HTTPException(status_code=500, detail="Failed to complete quest")
 
 # File organization endpoints
+# These routes are plain functions so FastAPI runs them in its threadpool;
+# the file system work they do would otherwise block the event loop
 @app.post("/api/files/scan")
-async def scan_folder(request: ScanRequest):
+def scan_folder(request: ScanRequest):
     """Scan a folder and return file analysis"""
     try:
-        results = file_manager.scan_folder(request.path)
+        results = file_manager.scan_folder(request.path, include_files=True)
         
         # Enhance results with AI classification
         if results.get("success"):
-            classified_files = ai_classifier.classify_files(results["files"])
+            classified_files = ai_classifier.iclassify_files(results.pop("files"))
             results["fileTypes"] = ai_classifier.get_file_type_distribution(classified_files)
         
         return results
@@ -174,7 +197,7 @@ async def scan_folder(request: ScanRequest):
         raise HTTPException(status_code=500, detail="Failed to scan folder")
 
 @app.post("/api/files/organize")
-async def organize_files(request: OrganizeRequest, background_tasks: BackgroundTasks):
+def organize_files(request: OrganizeRequest, background_tasks: BackgroundTasks):
     """Organize files based on rules"""
     try:
         result = file_manager.organize_files(request.path, request.rules)
@@ -186,8 +209,14 @@ async def organize_files(request: OrganizeRequest, background_tasks: BackgroundT
                 filesOrganized=result.get("filesOrganized", 0)
             )
             
-            # Award XP for organization
+            # Award XP for organization; rewards are checked against the
+            # updated stats, before the XP lands so a level up is detected
             xp_gained = result.get("filesOrganized", 0) * 5
+            background_tasks.add_task(
+                rewards_system.check_rewards,
+                xp_gained,
+                {"filesOrganized"}
+            )
             background_tasks.add_task(
                 db_manager.award_xp,
                 xp_gained
@@ -199,7 +228,7 @@ async def organize_files(request: OrganizeRequest, background_tasks: BackgroundT
         raise HTTPException(status_code=500, detail="Failed to organize files")
 
 @app.post("/api/files/quick-sort/{folder_type}")
-async def quick_sort_folder(folder_type: str, background_tasks: BackgroundTasks):
+def quick_sort_folder(folder_type: str, background_tasks: BackgroundTasks):
     """Quick sort common folders"""
     try:
         result = file_manager.quick_sort_folder(folder_type)
@@ -210,6 +239,11 @@ async def quick_sort_folder(folder_type: str, background_tasks: BackgroundTasks)
                 db_manager.update_user_stats,
                 filesOrganized=result.get("filesOrganized", 0)
             )
+            background_tasks.add_task(
+                rewards_system.check_rewards,
+                result.get("xpGained", 0),
+                {"filesOrganized"}
+            )
             background_tasks.add_task(
                 db_manager.award_xp,
                 result.get("xpGained", 0)
@@ -222,7 +256,7 @@ async def quick_sort_folder(folder_type: str, background_tasks: BackgroundTasks)
 
 # Duplicate detection endpoints
 @app.post("/api/duplicates/scan")
-async def scan_duplicates(request: ScanRequest):
+def scan_duplicates(request: ScanRequest):
     """Scan for duplicate files"""
     try:
         duplicates = file_manager.find_duplicates(request.path)
@@ -231,8 +265,25 @@ async def scan_duplicates(request: ScanRequest):
         logger.error(f"Failed to scan duplicates in {request.path}: {e}")
         raise HTTPException(status_code=500, detail="Failed to scan for duplicates")
 
+@app.post("/api/duplicates/scan/stream")
+async def stream_duplicates(request: ScanRequest):
+    """Stream duplicate groups as NDJSON, one line per group as it is confirmed"""
+    def ndjson_lines():
+        try:
+            for group in file_manager.iter_duplicates(request.path):
+                yield json.dumps(group) + "\n"
+        except Exception as e:
+            logger.error(f"Failed to stream duplicates in {request.path}: {e}")
+            # The 200 status is already sent, so the failure is reported as
+            # a last line that clients can tell apart from a group
+            yield json.dumps({"error": "Failed to scan for duplicates", "success": False}) + "\n"
+    
+    # Starlette iterates sync generators in its threadpool, so the scan
+    # doesn't block the event loop
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
 @app.delete("/api/duplicates/delete")
-async def delete_duplicate_files(request: DeleteDuplicatesRequest, background_tasks: BackgroundTasks):
+def delete_duplicate_files(request: DeleteDuplicatesRequest, background_tasks: BackgroundTasks):
     """Delete duplicate files"""
     try:
         result = file_manager.delete_files(request.files)
@@ -244,8 +295,13 @@ async def delete_duplicate_files(request: DeleteDuplicatesRequest, background_ta
                 duplicatesRemoved=len(request.files)
             )
             
-            # Award XP for cleaning duplicates
+            # Award XP for cleaning duplicates, checking rewards first as above
             xp_gained = len(request.files) * 10
+            background_tasks.add_task(
+                rewards_system.check_rewards,
+                xp_gained,
+                {"duplicatesRemoved"}
+            )
             background_tasks.add_task(
                 db_manager.award_xp,
                 xp_gained
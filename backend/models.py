@@ -2,6 +2,8 @@ from dataclasses import dataclass
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
+import sys
 
 class QuestType(Enum):
     ORGANIZE = "organize"
@@ -66,7 +68,7 @@ class Quest:
         if self.requirements is None:
             self.requirements = {}
 
-@dataclass
+@dataclass(slots=True)
 class Badge:
     id: str
     name: str
@@ -78,7 +80,7 @@ class Badge:
     quest_requirement: int = 0
     special_requirement: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Achievement:
     id: str
     name: str
@@ -90,7 +92,7 @@ class Achievement:
     completed: bool = False
     completed_at: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FileInfo:
     path: str
     name: str
@@ -109,7 +111,7 @@ class DuplicateGroup:
     total_size: int
     duplicate_count: int
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OrganizationRule:
     file_type: str
     enabled: bool
@@ -128,7 +130,7 @@ class ScanResult:
     success: bool = True
     error: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Activity:
     id: Optional[int] = None
     type: str = ""
@@ -140,7 +142,7 @@ class Activity:
         if self.timestamp is None:
             self.timestamp = datetime.now()
 
-@dataclass
+@dataclass(slots=True)
 class UserStats:
     files_organized: int = 0
     duplicates_removed: int = 0
@@ -163,21 +165,26 @@ class FileType(Enum):
     OTHER = "Other"
 
 FILE_TYPE_EXTENSIONS = {
-    FileType.IMAGE: ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp', '.ico', '.tiff'],
-    FileType.DOCUMENT: ['.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt', '.pages'],
-    FileType.SPREADSHEET: ['.xls', '.xlsx', '.csv', '.ods', '.numbers'],
-    FileType.PRESENTATION: ['.ppt', '.pptx', '.odp', '.key'],
-    FileType.VIDEO: ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v'],
-    FileType.AUDIO: ['.mp3', '.wav', '.flac', '.aac', '.ogg', '.wma', '.m4a'],
-    FileType.ARCHIVE: ['.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz'],
-    FileType.CODE: ['.js', '.py', '.html', '.css', '.java', '.cpp', '.c', '.php', '.rb', '.go'],
-    FileType.EXECUTABLE: ['.exe', '.msi', '.dmg', '.pkg', '.deb', '.rpm', '.app'],
+    FileType.IMAGE: frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp', '.ico', '.tiff'}),
+    FileType.DOCUMENT: frozenset({'.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt', '.pages'}),
+    FileType.SPREADSHEET: frozenset({'.xls', '.xlsx', '.csv', '.ods', '.numbers'}),
+    FileType.PRESENTATION: frozenset({'.ppt', '.pptx', '.odp', '.key'}),
+    FileType.VIDEO: frozenset({'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v'}),
+    FileType.AUDIO: frozenset({'.mp3', '.wav', '.flac', '.aac', '.ogg', '.wma', '.m4a'}),
+    FileType.ARCHIVE: frozenset({'.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz'}),
+    FileType.CODE: frozenset({'.js', '.py', '.html', '.css', '.java', '.cpp', '.c', '.php', '.rb', '.go'}),
+    FileType.EXECUTABLE: frozenset({'.exe', '.msi', '.dmg', '.pkg', '.deb', '.rpm', '.app'}),
+}
+
+# Reverse index of FILE_TYPE_EXTENSIONS so lookups are a single dict probe
+_EXT_TO_TYPE = {
+    sys.intern(ext): file_type
+    for file_type, extensions in FILE_TYPE_EXTENSIONS.items()
+    for ext in extensions
 }
 
+# Bounded so scanning many distinct junk extensions can't grow it without limit
+@lru_cache(maxsize=256)
 def get_file_type(extension: str) -> FileType:
     """Determine file type based on extension"""
-    extension = extension.lower()
-    for file_type, extensions in FILE_TYPE_EXTENSIONS.items():
-        if extension in extensions:
-            return file_type
-    return FileType.OTHER
+    return _EXT_TO_TYPE.get(extension.lower(), FileType.OTHER)
@@ -1,15 +1,228 @@
 import uuid
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, NamedTuple, Tuple
 from datetime import datetime, timedelta
-from dataclasses import asdict
+from functools import lru_cache
 import random
+import time
 
 from models import Quest, QuestType, QuestStatus, Difficulty
 from database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Seconds get_all_quests serves its last result before re-reading the database
+QUEST_CACHE_TTL = 5.0
+
+# Requirement keys that make a quest respond to each check_quest_progress action
+_ACTION_REQUIREMENTS = {
+    "files_organized": ("folder", "file_type", "files_organized"),
+    "duplicates_removed": ("min_duplicates", "duplicates_removed"),
+}
+
+class QuestTemplate(NamedTuple):
+    """Fixed data a generated quest is built from"""
+    title: str
+    description: str
+    type: QuestType
+    difficulty: Difficulty
+    xp_reward: int
+    icon: str
+    requirements: Dict[str, Any]
+    target: int = 1
+
+DAILY_QUEST_TEMPLATES = (
+    QuestTemplate(
+        title="Clean Your Downloads",
+        description="Organize files in your Downloads folder",
+        type=QuestType.ORGANIZE,
+        difficulty=Difficulty.EASY,
+        xp_reward=50,
+        icon="fas fa-download",
+        requirements={"folder": "downloads", "min_files": 5}
+    ),
+    QuestTemplate(
+        title="Desktop Declutter",
+        description="Clear and organize your Desktop",
+        type=QuestType.CLEAN,
+        difficulty=Difficulty.EASY,
+        xp_reward=40,
+        icon="fas fa-desktop",
+        requirements={"folder": "desktop", "min_files": 3}
+    ),
+    QuestTemplate(
+        title="Duplicate Hunter",
+        description="Find and remove duplicate files",
+        type=QuestType.DUPLICATE,
+        difficulty=Difficulty.MEDIUM,
+        xp_reward=75,
+        icon="fas fa-search",
+        requirements={"min_duplicates": 3}
+    ),
+    QuestTemplate(
+        title="Photo Organizer",
+        description="Sort images into proper folders",
+        type=QuestType.SORT,
+        difficulty=Difficulty.EASY,
+        xp_reward=45,
+        icon="fas fa-image",
+        requirements={"file_type": "Images", "min_files": 10}
+    ),
+    QuestTemplate(
+        title="Document Sorter",
+        description="Organize scattered documents",
+        type=QuestType.SORT,
+        difficulty=Difficulty.MEDIUM,
+        xp_reward=60,
+        icon="fas fa-file-text",
+        requirements={"file_type": "Documents", "min_files": 5}
+    ),
+    QuestTemplate(
+        title="Music Library Cleanup",
+        description="Organize your audio files",
+        type=QuestType.ORGANIZE,
+        difficulty=Difficulty.MEDIUM,
+        xp_reward=55,
+        icon="fas fa-music",
+        requirements={"file_type": "Audio", "min_files": 8}
+    ),
+    QuestTemplate(
+        title="Video Collection Sort",
+        description="Organize video files properly",
+        type=QuestType.SORT,
+        difficulty=Difficulty.HARD,
+        xp_reward=80,
+        icon="fas fa-video",
+        requirements={"file_type": "Videos", "min_files": 5}
+    ),
+    QuestTemplate(
+        title="Archive Explorer",
+        description="Review and organize compressed files",
+        type=QuestType.ORGANIZE,
+        difficulty=Difficulty.MEDIUM,
+        xp_reward=65,
+        icon="fas fa-file-archive",
+        requirements={"file_type": "Archives", "min_files": 3}
+    ),
+)
+
+WEEKLY_QUEST_TEMPLATES = (
+    QuestTemplate(
+        title="Master Organizer",
+        description="Organize 100 files this week",
+        type=QuestType.ORGANIZE,
+        difficulty=Difficulty.HARD,
+        xp_reward=200,
+        icon="fas fa-crown",
+        requirements={"files_organized": 100},
+        target=100
+    ),
+    QuestTemplate(
+        title="Duplicate Destroyer",
+        description="Remove 25 duplicate files",
+        type=QuestType.DUPLICATE,
+        difficulty=Difficulty.HARD,
+        xp_reward=150,
+        icon="fas fa-trash",
+        requirements={"duplicates_removed": 25},
+        target=25
+    ),
+    QuestTemplate(
+        title="Space Saver",
+        description="Free up 1GB of storage space",
+        type=QuestType.CLEAN,
+        difficulty=Difficulty.HARD,
+        xp_reward=250,
+        icon="fas fa-hdd",
+        requirements={"space_freed": 1024 * 1024 * 1024},  # 1GB
+        target=1
+    ),
+    QuestTemplate(
+        title="Quest Completionist",
+        description="Complete 10 daily quests this week",
+        type=QuestType.ORGANIZE,
+        difficulty=Difficulty.MEDIUM,
+        xp_reward=180,
+        icon="fas fa-tasks",
+        requirements={"daily_quests": 10},
+        target=10
+    ),
+    QuestTemplate(
+        title="Folder Master",
+        description="Organize 5 different folders",
+        type=QuestType.ORGANIZE,
+        difficulty=Difficulty.MEDIUM,
+        xp_reward=160,
+        icon="fas fa-folder-open",
+        requirements={"folders_organized": 5},
+        target=5
+    ),
+)
+
+ACHIEVEMENT_QUEST_TEMPLATES = (
+    QuestTemplate(
+        title="First Steps",
+        description="Complete your first organization task",
+        type=QuestType.ORGANIZE,
+        difficulty=Difficulty.EASY,
+        xp_reward=100,
+        icon="fas fa-baby",
+        requirements={"first_organization": True}
+    ),
+    QuestTemplate(
+        title="Streak Keeper",
+        description="Maintain a 7-day organization streak",
+        type=QuestType.ORGANIZE,
+        difficulty=Difficulty.MEDIUM,
+        xp_reward=300,
+        icon="fas fa-fire",
+        requirements={"streak_days": 7}
+    ),
+    QuestTemplate(
+        title="File Management Expert",
+        description="Organize 1000 files total",
+        type=QuestType.ORGANIZE,
+        difficulty=Difficulty.HARD,
+        xp_reward=500,
+        icon="fas fa-graduation-cap",
+        requirements={"total_files_organized": 1000}
+    ),
+    QuestTemplate(
+        title="Duplicate Detective",
+        description="Remove 100 duplicate files",
+        type=QuestType.DUPLICATE,
+        difficulty=Difficulty.HARD,
+        xp_reward=400,
+        icon="fas fa-search-plus",
+        requirements={"total_duplicates_removed": 100}
+    ),
+    QuestTemplate(
+        title="Storage Optimizer",
+        description="Free up 10GB of storage space",
+        type=QuestType.CLEAN,
+        difficulty=Difficulty.HARD,
+        xp_reward=750,
+        icon="fas fa-chart-line",
+        requirements={"total_space_freed": 10 * 1024 * 1024 * 1024}  # 10GB
+    ),
+)
+
+QUEST_TEMPLATES = {
+    "daily": DAILY_QUEST_TEMPLATES,
+    "weekly": WEEKLY_QUEST_TEMPLATES,
+    "achievements": ACHIEVEMENT_QUEST_TEMPLATES
+}
+
+@lru_cache(maxsize=8)
+def _select_templates(category: str, period: str, count: int) -> Tuple[QuestTemplate, ...]:
+    """
+    Pick count templates for a category, the same ones for every call in a
+    given period (e.g. a date), so regenerating after a restart matches
+    """
+    templates = QUEST_TEMPLATES[category]
+    rng = random.Random(f"{category}:{period}")
+    return tuple(rng.sample(templates, min(count, len(templates))))
+
 class QuestEngine:
     """
     Quest engine for managing daily/weekly quests and achievements
@@ -17,196 +230,30 @@ class QuestEngine:
     
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
-        self.quest_templates = self._initialize_quest_templates()
-    
-    def _initialize_quest_templates(self) -> Dict[str, Dict[str, Any]]:
-        """Initialize quest templates for different categories"""
-        return {
-            "daily": [
-                {
-                    "title": "Clean Your Downloads",
-                    "description": "Organize files in your Downloads folder",
-                    "type": QuestType.ORGANIZE,
-                    "difficulty": Difficulty.EASY,
-                    "xp_reward": 50,
-                    "icon": "fas fa-download",
-                    "requirements": {"folder": "downloads", "min_files": 5}
-                },
-                {
-                    "title": "Desktop Declutter",
-                    "description": "Clear and organize your Desktop",
-                    "type": QuestType.CLEAN,
-                    "difficulty": Difficulty.EASY,
-                    "xp_reward": 40,
-                    "icon": "fas fa-desktop",
-                    "requirements": {"folder": "desktop", "min_files": 3}
-                },
-                {
-                    "title": "Duplicate Hunter",
-                    "description": "Find and remove duplicate files",
-                    "type": QuestType.DUPLICATE,
-                    "difficulty": Difficulty.MEDIUM,
-                    "xp_reward": 75,
-                    "icon": "fas fa-search",
-                    "requirements": {"min_duplicates": 3}
-                },
-                {
-                    "title": "Photo Organizer",
-                    "description": "Sort images into proper folders",
-                    "type": QuestType.SORT,
-                    "difficulty": Difficulty.EASY,
-                    "xp_reward": 45,
-                    "icon": "fas fa-image",
-                    "requirements": {"file_type": "Images", "min_files": 10}
-                },
-                {
-                    "title": "Document Sorter",
-                    "description": "Organize scattered documents",
-                    "type": QuestType.SORT,
-                    "difficulty": Difficulty.MEDIUM,
-                    "xp_reward": 60,
-                    "icon": "fas fa-file-text",
-                    "requirements": {"file_type": "Documents", "min_files": 5}
-                },
-                {
-                    "title": "Music Library Cleanup",
-                    "description": "Organize your audio files",
-                    "type": QuestType.ORGANIZE,
-                    "difficulty": Difficulty.MEDIUM,
-                    "xp_reward": 55,
-                    "icon": "fas fa-music",
-                    "requirements": {"file_type": "Audio", "min_files": 8}
-                },
-                {
-                    "title": "Video Collection Sort",
-                    "description": "Organize video files properly",
-                    "type": QuestType.SORT,
-                    "difficulty": Difficulty.HARD,
-                    "xp_reward": 80,
-                    "icon": "fas fa-video",
-                    "requirements": {"file_type": "Videos", "min_files": 5}
-                },
-                {
-                    "title": "Archive Explorer",
-                    "description": "Review and organize compressed files",
-                    "type": QuestType.ORGANIZE,
-                    "difficulty": Difficulty.MEDIUM,
-                    "xp_reward": 65,
-                    "icon": "fas fa-file-archive",
-                    "requirements": {"file_type": "Archives", "min_files": 3}
-                }
-            ],
-            "weekly": [
-                {
-                    "title": "Master Organizer",
-                    "description": "Organize 100 files this week",
-                    "type": QuestType.ORGANIZE,
-                    "difficulty": Difficulty.HARD,
-                    "xp_reward": 200,
-                    "icon": "fas fa-crown",
-                    "requirements": {"files_organized": 100},
-                    "target": 100
-                },
-                {
-                    "title": "Duplicate Destroyer",
-                    "description": "Remove 25 duplicate files",
-                    "type": QuestType.DUPLICATE,
-                    "difficulty": Difficulty.HARD,
-                    "xp_reward": 150,
-                    "icon": "fas fa-trash",
-                    "requirements": {"duplicates_removed": 25},
-                    "target": 25
-                },
-                {
-                    "title": "Space Saver",
-                    "description": "Free up 1GB of storage space",
-                    "type": QuestType.CLEAN,
-                    "difficulty": Difficulty.HARD,
-                    "xp_reward": 250,
-                    "icon": "fas fa-hdd",
-                    "requirements": {"space_freed": 1024 * 1024 * 1024},  # 1GB
-                    "target": 1
-                },
-                {
-                    "title": "Quest Completionist",
-                    "description": "Complete 10 daily quests this week",
-                    "type": QuestType.ORGANIZE,
-                    "difficulty": Difficulty.MEDIUM,
-                    "xp_reward": 180,
-                    "icon": "fas fa-tasks",
-                    "requirements": {"daily_quests": 10},
-                    "target": 10
-                },
-                {
-                    "title": "Folder Master",
-                    "description": "Organize 5 different folders",
-                    "type": QuestType.ORGANIZE,
-                    "difficulty": Difficulty.MEDIUM,
-                    "xp_reward": 160,
-                    "icon": "fas fa-folder-open",
-                    "requirements": {"folders_organized": 5},
-                    "target": 5
-                }
-            ],
-            "achievements": [
-                {
-                    "title": "First Steps",
-                    "description": "Complete your first organization task",
-                    "type": QuestType.ORGANIZE,
-                    "difficulty": Difficulty.EASY,
-                    "xp_reward": 100,
-                    "icon": "fas fa-baby",
-                    "requirements": {"first_organization": True}
-                },
-                {
-                    "title": "Streak Keeper",
-                    "description": "Maintain a 7-day organization streak",
-                    "type": QuestType.ORGANIZE,
-                    "difficulty": Difficulty.MEDIUM,
-                    "xp_reward": 300,
-                    "icon": "fas fa-fire",
-                    "requirements": {"streak_days": 7}
-                },
-                {
-                    "title": "File Management Expert",
-                    "description": "Organize 1000 files total",
-                    "type": QuestType.ORGANIZE,
-                    "difficulty": Difficulty.HARD,
-                    "xp_reward": 500,
-                    "icon": "fas fa-graduation-cap",
-                    "requirements": {"total_files_organized": 1000}
-                },
-                {
-                    "title": "Duplicate Detective",
-                    "description": "Remove 100 duplicate files",
-                    "type": QuestType.DUPLICATE,
-                    "difficulty": Difficulty.HARD,
-                    "xp_reward": 400,
-                    "icon": "fas fa-search-plus",
-                    "requirements": {"total_duplicates_removed": 100}
-                },
-                {
-                    "title": "Storage Optimizer",
-                    "description": "Free up 10GB of storage space",
-                    "type": QuestType.CLEAN,
-                    "difficulty": Difficulty.HARD,
-                    "xp_reward": 750,
-                    "icon": "fas fa-chart-line",
-                    "requirements": {"total_space_freed": 10 * 1024 * 1024 * 1024}  # 10GB
-                }
-            ]
-        }
+        self.quest_templates = QUEST_TEMPLATES
+        
+        # Memoized (quests by category, {id: (quest, category)}, load time),
+        # replaced as a whole so concurrent readers always see a matching pair;
+        # cleared whenever quests are written
+        self._quest_cache: Optional[Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, tuple], float]] = None
+        # action type -> [(quest, requirements, min_files)], built on first use
+        self._quests_by_action: Optional[Dict[str, List[tuple]]] = None
     
     def initialize_quests(self):
         """Initialize daily quests for today if none exist"""
         try:
-            today = datetime.now().date()
+            now = datetime.now()
+            today = now.date()
             existing_quests = self.db.get_quests_by_category("daily")
             
+            # Deadlines are ISO 8601 strings, which sort and slice like the
+            # dates they hold, so they're compared without being parsed
+            today_iso = today.isoformat()
+            
             # Check if we have quests for today
             today_quests = [
                 q for q in existing_quests 
-                if q.get("deadline") and datetime.fromisoformat(q["deadline"]).date() == today
+                if q.get("deadline") and q["deadline"][:10] == today_iso
             ]
             
             if not today_quests:
@@ -214,14 +261,13 @@ class QuestEngine:
                 logger.info("Generated new daily quests")
             
             # Generate weekly quests if it's Monday and none exist
-            if datetime.now().weekday() == 0:  # Monday
+            if now.weekday() == 0:  # Monday
                 weekly_quests = self.db.get_quests_by_category("weekly")
-                this_week_start = today - timedelta(days=today.weekday())
+                this_week_start = today_iso  # It's Monday
                 
                 current_week_quests = [
                     q for q in weekly_quests
-                    if q.get("deadline") and 
-                    datetime.fromisoformat(q["deadline"]).date() >= this_week_start
+                    if (q.get("deadline") or "") >= this_week_start
                 ]
                 
                 if not current_week_quests:
@@ -240,93 +286,125 @@ class QuestEngine:
     def _generate_daily_quests(self):
         """Generate 3-5 random daily quests"""
         try:
-            daily_templates = self.quest_templates["daily"]
-            selected_templates = random.sample(daily_templates, min(4, len(daily_templates)))
+            now = datetime.now()
+            selected_templates = _select_templates("daily", now.date().isoformat(), 4)
             
-            tomorrow = datetime.now() + timedelta(days=1)
+            tomorrow = now + timedelta(days=1)
             tomorrow_end = tomorrow.replace(hour=23, minute=59, second=59)
             
-            for template in selected_templates:
-                quest = Quest(
+            quests = [
+                Quest(
                     id=f"daily_{uuid.uuid4().hex[:8]}",
-                    title=template["title"],
-                    description=template["description"],
-                    type=template["type"],
-                    difficulty=template["difficulty"],
-                    xp_reward=template["xp_reward"],
+                    title=template.title,
+                    description=template.description,
+                    type=template.type,
+                    difficulty=template.difficulty,
+                    xp_reward=template.xp_reward,
                     category="daily",
                     deadline=tomorrow_end,
-                    icon=template["icon"],
-                    requirements=template.get("requirements", {}),
-                    target=template.get("target", 1)
+                    icon=template.icon,
+                    requirements=template.requirements,
+                    target=template.target
                 )
-                
-                self.db.save_quest(quest)
-                
+                for template in selected_templates
+            ]
+            self.db.save_quests(quests)
+            
         except Exception as e:
             logger.error(f"Failed to generate daily quests: {e}")
+        
+        self._invalidate_quest_cache()
     
     def _generate_weekly_quests(self):
         """Generate 2-3 weekly quests"""
         try:
-            weekly_templates = self.quest_templates["weekly"]
-            selected_templates = random.sample(weekly_templates, min(3, len(weekly_templates)))
+            now = datetime.now()
+            year, week, _ = now.isocalendar()
+            selected_templates = _select_templates("weekly", f"{year}-W{week:02d}", 3)
             
-            next_sunday = datetime.now() + timedelta(days=(6 - datetime.now().weekday()))
+            next_sunday = now + timedelta(days=(6 - now.weekday()))
             next_sunday_end = next_sunday.replace(hour=23, minute=59, second=59)
             
-            for template in selected_templates:
-                quest = Quest(
+            quests = [
+                Quest(
                     id=f"weekly_{uuid.uuid4().hex[:8]}",
-                    title=template["title"],
-                    description=template["description"],
-                    type=template["type"],
-                    difficulty=template["difficulty"],
-                    xp_reward=template["xp_reward"],
+                    title=template.title,
+                    description=template.description,
+                    type=template.type,
+                    difficulty=template.difficulty,
+                    xp_reward=template.xp_reward,
                     category="weekly",
                     deadline=next_sunday_end,
-                    icon=template["icon"],
-                    requirements=template.get("requirements", {}),
-                    target=template.get("target", 1)
+                    icon=template.icon,
+                    requirements=template.requirements,
+                    target=template.target
                 )
-                
-                self.db.save_quest(quest)
-                
+                for template in selected_templates
+            ]
+            self.db.save_quests(quests)
+            
         except Exception as e:
             logger.error(f"Failed to generate weekly quests: {e}")
+        
+        self._invalidate_quest_cache()
     
     def _generate_achievement_quests(self):
         """Generate persistent achievement quests"""
         try:
             achievement_templates = self.quest_templates["achievements"]
             
-            for template in achievement_templates:
-                quest = Quest(
-                    id=f"achievement_{template['title'].lower().replace(' ', '_')}",
-                    title=template["title"],
-                    description=template["description"],
-                    type=template["type"],
-                    difficulty=template["difficulty"],
-                    xp_reward=template["xp_reward"],
+            quests = [
+                Quest(
+                    id=f"achievement_{template.title.lower().replace(' ', '_')}",
+                    title=template.title,
+                    description=template.description,
+                    type=template.type,
+                    difficulty=template.difficulty,
+                    xp_reward=template.xp_reward,
                     category="achievements",
-                    icon=template["icon"],
-                    requirements=template.get("requirements", {}),
-                    target=template.get("target", 1)
+                    icon=template.icon,
+                    requirements=template.requirements,
+                    target=template.target
                 )
-                
-                self.db.save_quest(quest)
-                
+                for template in achievement_templates
+            ]
+            self.db.save_quests(quests)
+            
         except Exception as e:
             logger.error(f"Failed to generate achievement quests: {e}")
+        
+        self._invalidate_quest_cache()
+    
+    def _invalidate_quest_cache(self):
+        """Drop the memoized quests and their id index"""
+        self._quest_cache = None
+        self._quests_by_action = None
+    
+    def _load_quests(self) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, tuple], float]:
+        """Return the memoized quest snapshot, reloading it once it is stale"""
+        cache = self._quest_cache
+        if cache is not None and time.monotonic() - cache[2] < QUEST_CACHE_TTL:
+            return cache
+        
+        quests = {
+            "daily": self.db.get_quests_by_category("daily"),
+            "weekly": self.db.get_quests_by_category("weekly"),
+            "achievements": self.db.get_quests_by_category("achievements")
+        }
+        quest_index = {
+            quest["id"]: (quest, category)
+            for category, category_quests in quests.items()
+            for quest in category_quests
+        }
+        cache = (quests, quest_index, time.monotonic())
+        self._quest_cache = cache
+        self._quests_by_action = None
+        return cache
     
     def get_all_quests(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get all quests organized by category"""
         try:
-            return {
-                "daily": self.db.get_quests_by_category("daily"),
-                "weekly": self.db.get_quests_by_category("weekly"),
-                "achievements": self.db.get_quests_by_category("achievements")
-            }
+            return self._load_quests()[0]
         except Exception as e:
             logger.error(f"Failed to get all quests: {e}")
             return {"daily": [], "weekly": [], "achievements": []}
@@ -334,15 +412,8 @@ class QuestEngine:
     def get_todays_quests(self) -> List[Dict[str, Any]]:
         """Get today's active quests"""
         try:
-            daily_quests = self.db.get_quests_by_category("daily")
-            today = datetime.now().date()
-            
-            today_quests = [
-                quest for quest in daily_quests
-                if quest.get("deadline") and 
-                datetime.fromisoformat(quest["deadline"]).date() >= today and
-                quest.get("status") != "completed"
-            ]
+            today_iso = datetime.now().date().isoformat()
+            today_quests = self.db.get_active_quests("daily", today_iso)
             
             return today_quests[:5]  # Return top 5
             
@@ -355,6 +426,7 @@ class QuestEngine:
         try:
             # Mark quest as completed in database
             success = self.db.complete_quest(quest_id)
+            self._invalidate_quest_cache()
             
             if not success:
                 return {
@@ -363,16 +435,10 @@ class QuestEngine:
                 }
             
             # Get quest details to determine XP reward
-            all_quests = self.get_all_quests()
-            completed_quest = None
-            
-            for category_quests in all_quests.values():
-                for quest in category_quests:
-                    if quest["id"] == quest_id:
-                        completed_quest = quest
-                        break
-                if completed_quest:
-                    break
+            # Look it up in the snapshot we hold, so a concurrent cache
+            # invalidation can't empty the index under us
+            completed_quest, category = self._load_quests()[1].get(quest_id, (None, None))
+            is_daily = category == "daily"
             
             if not completed_quest:
                 return {
@@ -386,7 +452,10 @@ class QuestEngine:
             self.db.award_xp(xp_gained)
             
             # Update user quest completion count
-            self.db.update_user_stats(questsCompleted=1)
+            if is_daily:
+                self.db.update_user_stats(questsCompleted=1, dailyQuestsCompleted=1)
+            else:
+                self.db.update_user_stats(questsCompleted=1)
             
             # Check if user leveled up
             user_data = self.db.get_user_data()
@@ -415,57 +484,76 @@ class QuestEngine:
                 "error": str(e)
             }
     
+    def _get_quests_by_action(self) -> Dict[str, List[tuple]]:
+        """Index the open quests by the check_quest_progress actions they respond to"""
+        all_quests = self.get_all_quests()
+        if self._quests_by_action is not None:
+            return self._quests_by_action
+        
+        # Quest rows don't carry their requirements, so they're read once
+        # per cache refresh rather than with every quest listing
+        requirements_by_id = self.db.get_quest_requirements()
+        
+        quests_by_action = {action: [] for action in _ACTION_REQUIREMENTS}
+        for quests in all_quests.values():
+            for quest in quests:
+                if quest.get("status") == "completed":
+                    continue
+                
+                requirements = requirements_by_id.get(quest["id"], {})
+                entry = (quest, requirements, requirements.get("min_files", 1))
+                for action, keys in _ACTION_REQUIREMENTS.items():
+                    if any(key in requirements for key in keys):
+                        quests_by_action[action].append(entry)
+        
+        self._quests_by_action = quests_by_action
+        return quests_by_action
+    
     def check_quest_progress(self, action_type: str, **kwargs) -> List[str]:
         """Check and update quest progress based on user actions"""
         try:
             updated_quests = []
-            all_quests = self.get_all_quests()
             
-            for category, quests in all_quests.items():
-                for quest in quests:
-                    if quest.get("status") == "completed":
-                        continue
+            for quest, requirements, min_files in self._get_quests_by_action().get(action_type, ()):
+                should_update = False
+                
+                # Check different action types
+                if action_type == "files_organized":
+                    files_count = kwargs.get("count", 0)
+                    folder_type = kwargs.get("folder_type", "")
+                    file_types = kwargs.get("file_types", [])
                     
-                    requirements = quest.get("requirements", {})
-                    should_update = False
+                    # Check folder-specific quests
+                    if requirements.get("folder") == folder_type and files_count >= min_files:
+                        should_update = True
                     
-                    # Check different action types
-                    if action_type == "files_organized":
-                        files_count = kwargs.get("count", 0)
-                        folder_type = kwargs.get("folder_type", "")
-                        file_types = kwargs.get("file_types", [])
-                        
-                        # Check folder-specific quests
-                        if requirements.get("folder") == folder_type and files_count >= requirements.get("min_files", 1):
-                            should_update = True
-                        
-                        # Check file-type specific quests
-                        if requirements.get("file_type") in file_types and files_count >= requirements.get("min_files", 1):
-                            should_update = True
-                        
-                        # Check general organization quests
-                        if requirements.get("files_organized") and files_count > 0:
-                            current_progress = quest.get("progress", 0)
-                            new_progress = min(current_progress + files_count, quest.get("target", 1))
-                            if new_progress > current_progress:
-                                # Update quest progress
-                                # Note: This would need to be implemented in the database
-                                should_update = True
+                    # Check file-type specific quests
+                    if requirements.get("file_type") in file_types and files_count >= min_files:
+                        should_update = True
                     
-                    elif action_type == "duplicates_removed":
-                        duplicates_count = kwargs.get("count", 0)
-                        
-                        if requirements.get("min_duplicates") and duplicates_count >= requirements["min_duplicates"]:
+                    # Check general organization quests
+                    if requirements.get("files_organized") and files_count > 0:
+                        current_progress = quest.get("progress", 0)
+                        new_progress = min(current_progress + files_count, quest.get("target", 1))
+                        if new_progress > current_progress:
+                            # Update quest progress
+                            # Note: This would need to be implemented in the database
                             should_update = True
-                        
-                        if requirements.get("duplicates_removed"):
-                            current_progress = quest.get("progress", 0)
-                            new_progress = min(current_progress + duplicates_count, quest.get("target", 1))
-                            if new_progress > current_progress:
-                                should_update = True
+                
+                elif action_type == "duplicates_removed":
+                    duplicates_count = kwargs.get("count", 0)
                     
-                    if should_update:
-                        updated_quests.append(quest["id"])
+                    if requirements.get("min_duplicates") and duplicates_count >= requirements["min_duplicates"]:
+                        should_update = True
+                    
+                    if requirements.get("duplicates_removed"):
+                        current_progress = quest.get("progress", 0)
+                        new_progress = min(current_progress + duplicates_count, quest.get("target", 1))
+                        if new_progress > current_progress:
+                            should_update = True
+                
+                if should_update:
+                    updated_quests.append(quest["id"])
             
             return updated_quests
             
@@ -499,8 +587,7 @@ class QuestEngine:
                 })
             
             # Suggest based on completion patterns
-            completed_quests = self.db.get_quests_by_category("daily")
-            completed_count = len([q for q in completed_quests if q.get("status") == "completed"])
+            completed_count = user_stats.get("dailyQuestsCompleted", 0)
             
             if completed_count > 5:
                 suggestions.append({
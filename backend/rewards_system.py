@@ -1,89 +1,231 @@
+import functools
+import heapq
+import itertools
 import logging
-from typing import Dict, List, Optional, Any, Tuple
-from datetime import datetime, timedelta
+import threading
+from operator import itemgetter
+from typing import Dict, List, Optional, Any, Tuple, Set, Callable
+from datetime import datetime, date, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 from models import Badge, Achievement, User
 from database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Ordinal of 1970-01-01, to turn dates into the db's day numbers
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Seconds between full badge sweeps, which catch anything a narrowed
+# check_rewards call didn't look at
+FORCE_CHECK_INTERVAL = 300.0
+
+def _safe(action: str, default_factory: Callable[[], Any] = list):
+    """Log failures of the wrapped method as 'Failed to <action>' and return a fresh default"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Failed to {action}: {e}")
+                return default_factory()
+        return wrapper
+    return decorator
+
+# User stat each stat-based badge requirement type is measured against
+_STAT_KEY_OF_TYPE = {
+    "files_organized": "filesOrganized",
+    "duplicates_removed": "duplicatesRemoved",
+    "total_quests": "questsCompleted",
+    "quest_completion": "questsCompleted"
+}
+
+# Badge unlock requirements
+_BADGE_REQUIREMENTS: Dict[str, Dict[str, Any]] = {
+    "clean_desk_novice": {
+        "type": "quest_completion",
+        "requirement": 1,
+        "category": "organization"
+    },
+    "download_slayer": {
+        "type": "folder_cleanups",
+        "requirement": 5,
+        "folder": "downloads"
+    },
+    "duplicate_destroyer": {
+        "type": "duplicates_removed",
+        "requirement": 100
+    },
+    "file_master": {
+        "type": "files_organized",
+        "requirement": 1000
+    },
+    "organization_guru": {
+        "type": "level_reached",
+        "requirement": 20
+    },
+    "speed_sorter": {
+        "type": "daily_quests",
+        "requirement": 10,
+        "timeframe": "single_day"
+    },
+    "streak_master": {
+        "type": "streak_days",
+        "requirement": 30
+    },
+    "quest_completer": {
+        "type": "total_quests",
+        "requirement": 100
+    }
+}
+
+# (badge_id, requirement, details) by requirement type
+_BADGES_BY_TYPE: Dict[str, List[Tuple[str, int, Dict[str, Any]]]] = {}
+for _badge_id, _requirements in _BADGE_REQUIREMENTS.items():
+    _BADGES_BY_TYPE.setdefault(_requirements["type"], []).append(
+        (_badge_id, _requirements["requirement"], _requirements)
+    )
+
+# Badges _check_stat_badges can decide, in definition order, resolved to
+# (badge_id, source, key, requirement): source 0 reads the key from user
+# stats, 1 from user data
+_STAT_BADGES: List[Tuple[str, int, str, int]] = []
+for _badge_id, _requirements in _BADGE_REQUIREMENTS.items():
+    if _requirements["type"] in _STAT_KEY_OF_TYPE:
+        _STAT_BADGES.append((_badge_id, 0, _STAT_KEY_OF_TYPE[_requirements["type"]], _requirements["requirement"]))
+    elif _requirements["type"] == "streak_days":
+        _STAT_BADGES.append((_badge_id, 1, "streak", _requirements["requirement"]))
+del _badge_id, _requirements
+
+# Achievement completion conditions, called with (current, new) progress
+def _first_progress(current: int, new: int) -> bool:
+    return current == 0 and new > 0
+
+def _reached_100(current: int, new: int) -> bool:
+    return new >= 100
+
+def _reached_50(current: int, new: int) -> bool:
+    return new >= 50
+
+def _reached_1gb(current: int, new: int) -> bool:
+    return new >= 1024 * 1024 * 1024
+
+# Achievement tracking configuration
+_ACHIEVEMENT_TRACKERS: Dict[str, Dict[str, Any]] = {
+    "first_organization": {
+        "trigger": "files_organized",
+        "condition": _first_progress
+    },
+    "file_organizer": {
+        "trigger": "files_organized",
+        "condition": _reached_100
+    },
+    "duplicate_hunter": {
+        "trigger": "duplicates_removed",
+        "condition": _reached_50
+    },
+    "quest_master": {
+        "trigger": "quests_completed",
+        "condition": _reached_50
+    },
+    "storage_saver": {
+        "trigger": "space_freed",
+        "condition": _reached_1gb
+    }
+}
+
 class RewardsSystem:
     """
     Rewards system for managing badges, achievements, and user progression
     """
     
+    # User stat each achievement's progress is read from. storage_saver isn't
+    # listed: it would need space freed tracking, so its progress stays 0.
+    _PROGRESS_STAT_KEYS = {
+        "first_organization": "filesOrganized",
+        "file_organizer": "filesOrganized",
+        "duplicate_hunter": "duplicatesRemoved",
+        "quest_master": "questsCompleted"
+    }
+    
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
-        self.badge_requirements = self._initialize_badge_requirements()
-        self.achievement_trackers = self._initialize_achievement_trackers()
+        
+        # Shared, import-time tables; treat them as read-only
+        self.badge_requirements = _BADGE_REQUIREMENTS
+        self.achievement_trackers = _ACHIEVEMENT_TRACKERS
+        self._by_type = _BADGES_BY_TYPE
+        self._stat_badges = _STAT_BADGES
+        
+        # Advisory writes (activity log) run here, off the caller's path
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rewards-log")
+        
+        # Periodic full sweep; the lock keeps close() from racing a re-arm
+        self._force_check_lock = threading.Lock()
+        self._force_check_timer: Optional[threading.Timer] = None
+        self._closed = False
+        
+        # Last rewards summary, tagged with the data versions it was built from.
+        # _rewards_version covers writes made here that don't touch user data
+        # (achievement progress); user data changes show up in the db's version.
+        # It is bumped after those writes, so a summary built while they were
+        # in flight is never tagged with the new version.
+        self._version_counter = itertools.count(1)
+        self._rewards_version = 0
+        self._cached_summary: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None
     
-    def _initialize_badge_requirements(self) -> Dict[str, Dict[str, Any]]:
-        """Initialize badge unlock requirements"""
-        return {
-            "clean_desk_novice": {
-                "type": "quest_completion",
-                "requirement": 1,
-                "category": "organization"
-            },
-            "download_slayer": {
-                "type": "folder_cleanups",
-                "requirement": 5,
-                "folder": "downloads"
-            },
-            "duplicate_destroyer": {
-                "type": "duplicates_removed",
-                "requirement": 100
-            },
-            "file_master": {
-                "type": "files_organized",
-                "requirement": 1000
-            },
-            "organization_guru": {
-                "type": "level_reached",
-                "requirement": 20
-            },
-            "speed_sorter": {
-                "type": "daily_quests",
-                "requirement": 10,
-                "timeframe": "single_day"
-            },
-            "streak_master": {
-                "type": "streak_days",
-                "requirement": 30
-            },
-            "quest_completer": {
-                "type": "total_quests",
-                "requirement": 100
-            }
-        }
+    def close(self):
+        """Finish pending background writes (call on shutdown, before closing the db)"""
+        with self._force_check_lock:
+            self._closed = True
+            if self._force_check_timer is not None:
+                self._force_check_timer.cancel()
+        self._background.shutdown(wait=True)
     
-    def _initialize_achievement_trackers(self) -> Dict[str, Dict[str, Any]]:
-        """Initialize achievement tracking configuration"""
-        return {
-            "first_organization": {
-                "trigger": "files_organized",
-                "condition": lambda current, new: current == 0 and new > 0
-            },
-            "file_organizer": {
-                "trigger": "files_organized",
-                "condition": lambda current, new: new >= 100
-            },
-            "duplicate_hunter": {
-                "trigger": "duplicates_removed", 
-                "condition": lambda current, new: new >= 50
-            },
-            "quest_master": {
-                "trigger": "quests_completed",
-                "condition": lambda current, new: new >= 50
-            },
-            "storage_saver": {
-                "trigger": "space_freed",
-                "condition": lambda current, new: new >= 1024 * 1024 * 1024  # 1GB
-            }
-        }
+    def schedule_force_check(self, interval: float = FORCE_CHECK_INTERVAL):
+        """Run force_check_all_badges every interval seconds until close()"""
+        with self._force_check_lock:
+            if self._closed:
+                return
+            if self._force_check_timer is not None:
+                self._force_check_timer.cancel()
+            self._force_check_timer = threading.Timer(interval, self._run_force_check, (interval,))
+            self._force_check_timer.daemon = True
+            self._force_check_timer.start()
+    
+    def _run_force_check(self, interval: float):
+        """Timer callback: sweep, then schedule the next sweep"""
+        try:
+            self.force_check_all_badges()
+        finally:
+            self.schedule_force_check(interval)
+    
+    def force_check_all_badges(self) -> Dict[str, Any]:
+        """Evaluate every badge and achievement, whatever changed"""
+        rewards = self.check_rewards(0)
+        if rewards["newBadges"] or rewards["newAchievements"]:
+            logger.info(f"Force check awarded {rewards['newBadges']} {rewards['newAchievements']}")
+        return rewards
     
-    def check_rewards(self, xp_gained: int) -> Dict[str, Any]:
-        """Check for new badges and achievements after XP gain"""
+    def _log_activity(self, activity: Dict[str, Any]):
+        """Write an activity entry from the background worker"""
+        try:
+            self.db.add_activity(activity)
+        except Exception as e:
+            logger.error(f"Failed to log activity {activity['type']}: {e}")
+    
+    def _invalidate_summary(self):
+        """Drop the memoized rewards summary (call after the writes that stale it)"""
+        self._rewards_version = next(self._version_counter)
+        self._cached_summary = None
+    
+    def check_rewards(self, xp_gained: int, changed_stats: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """
+        Check for new badges and achievements after XP gain. changed_stats names
+        the user stats (e.g. "filesOrganized", "streak") that moved; only badges
+        and achievements depending on them are evaluated. None checks them all.
+        """
         try:
             rewards = {
                 "newBadges": [],
@@ -92,149 +234,112 @@ class RewardsSystem:
                 "newLevel": None
             }
             
+            # Nothing moved, so nothing can have been earned
+            if not xp_gained and changed_stats is not None and not changed_stats:
+                return rewards
+            
             # Get current user data
             user_data = self.db.get_user_data()
             user_stats = self.db.get_user_stats()
+            current_badges = set(user_data.get("badges", []))
             
             # Check for level up
             old_level = user_data["level"]
             new_total_xp = user_data["totalXp"] + xp_gained
-            new_level = max(1, int(new_total_xp / 100) + 1)
+            new_level = new_total_xp // 100 + 1
             
             if new_level > old_level:
                 rewards["levelUp"] = True
                 rewards["newLevel"] = new_level
                 
                 # Check for level-based badges
-                level_badges = self._check_level_badges(new_level)
+                level_badges = self._check_level_badges(new_level, current_badges)
                 rewards["newBadges"].extend(level_badges)
             
             # Check for stat-based badges
-            stat_badges = self._check_stat_badges(user_stats)
+            stat_badges = self._check_stat_badges(user_stats, user_data, current_badges, changed_stats)
             rewards["newBadges"].extend(stat_badges)
             
             # Check for achievements
-            new_achievements = self._check_achievements(user_stats)
-            rewards["newAchievements"].extend(new_achievements)
-            
-            # Update user badges if any new ones were earned
+            if changed_stats is None or not changed_stats.isdisjoint(self._PROGRESS_STAT_KEYS.values()):
+                new_achievements = self._check_achievements(user_stats)
+                rewards["newAchievements"].extend(new_achievements)
+            
+            # Store only the newly earned badges; rewriting the whole user row
+            # from user_data would undo XP awarded for achievements above.
+            # Report just the ones this call stored, in case a concurrent
+            # check earned the same badge first.
             if rewards["newBadges"]:
-                current_badges = user_data.get("badges", [])
-                updated_badges = current_badges + rewards["newBadges"]
-                
-                self.db.update_user_data({
-                    **user_data,
-                    "badges": updated_badges
-                })
+                rewards["newBadges"] = self.db.add_user_badges(rewards["newBadges"])
             
+            self._invalidate_summary()
             return rewards
             
         except Exception as e:
+            # Some of the writes may have gone through
+            self._invalidate_summary()
             logger.error(f"Failed to check rewards: {e}")
             return {"newBadges": [], "newAchievements": [], "levelUp": False}
     
-    def _check_level_badges(self, level: int) -> List[str]:
+    @_safe("check level badges")
+    def _check_level_badges(self, level: int, current_badges: Set[str]) -> List[str]:
         """Check for badges unlocked by reaching certain levels"""
-        try:
-            new_badges = []
-            
-            for badge_id, requirements in self.badge_requirements.items():
-                if requirements["type"] == "level_reached" and level >= requirements["requirement"]:
-                    # Check if user already has this badge
-                    user_data = self.db.get_user_data()
-                    if badge_id not in user_data.get("badges", []):
-                        new_badges.append(badge_id)
-            
-            return new_badges
-            
-        except Exception as e:
-            logger.error(f"Failed to check level badges: {e}")
-            return []
+        new_badges = []
+        
+        for badge_id, req_value, _ in self._by_type.get("level_reached", ()):
+            if level >= req_value and badge_id not in current_badges:
+                new_badges.append(badge_id)
+        
+        return new_badges
     
-    def _check_stat_badges(self, user_stats: Dict[str, int]) -> List[str]:
-        """Check for badges unlocked by user statistics"""
-        try:
-            new_badges = []
-            user_data = self.db.get_user_data()
-            current_badges = user_data.get("badges", [])
-            
-            for badge_id, requirements in self.badge_requirements.items():
-                if badge_id in current_badges:
-                    continue
-                
-                req_type = requirements["type"]
-                req_value = requirements["requirement"]
-                
-                should_unlock = False
-                
-                if req_type == "files_organized":
-                    should_unlock = user_stats.get("filesOrganized", 0) >= req_value
-                elif req_type == "duplicates_removed":
-                    should_unlock = user_stats.get("duplicatesRemoved", 0) >= req_value
-                elif req_type == "total_quests":
-                    should_unlock = user_stats.get("questsCompleted", 0) >= req_value
-                elif req_type == "streak_days":
-                    should_unlock = user_data.get("streak", 0) >= req_value
-                elif req_type == "quest_completion":
-                    should_unlock = user_stats.get("questsCompleted", 0) >= req_value
-                
-                if should_unlock:
-                    new_badges.append(badge_id)
-            
-            return new_badges
-            
-        except Exception as e:
-            logger.error(f"Failed to check stat badges: {e}")
-            return []
+    @_safe("check stat badges")
+    def _check_stat_badges(self, user_stats: Dict[str, int], user_data: Dict[str, Any],
+                           current_badges: Set[str], changed_stats: Optional[Set[str]] = None) -> List[str]:
+        """Check for badges unlocked by user statistics (only changed_stats ones, if given)"""
+        new_badges = []
+        
+        sources = (user_stats, user_data)
+        
+        for badge_id, source, key, req_value in self._stat_badges:
+            if changed_stats is not None and key not in changed_stats:
+                continue
+            if badge_id not in current_badges and sources[source].get(key, 0) >= req_value:
+                new_badges.append(badge_id)
+        
+        return new_badges
     
+    @_safe("check achievements")
     def _check_achievements(self, user_stats: Dict[str, int]) -> List[str]:
         """Check for completed achievements"""
-        try:
-            new_achievements = []
-            achievements = self.db.get_achievements()
-            
-            for achievement in achievements:
-                if achievement.get("completed"):
-                    continue
-                
-                achievement_id = achievement["id"]
-                current_progress = achievement.get("progress", 0)
-                target = achievement.get("target", 1)
-                
-                # Update progress based on user stats
-                new_progress = self._calculate_achievement_progress(achievement_id, user_stats)
+        new_achievements = []
+        progress_updates = []
+        bonus_xp = 0
+        progress_mapping = self._achievement_progress(user_stats)
+        
+        for achievement in self.db.get_open_achievements():
+            # Update progress based on user stats
+            new_progress = progress_mapping.get(achievement.id, 0)
+            
+            if new_progress > achievement.progress:
+                progress_updates.append((achievement.id, new_progress))
                 
-                if new_progress > current_progress:
-                    self.db.update_achievement_progress(achievement_id, new_progress)
-                    
-                    if new_progress >= target:
-                        new_achievements.append(achievement_id)
-                        # Award achievement XP
-                        xp_reward = achievement.get("xpReward", 100)
-                        self.db.award_xp(xp_reward)
-            
-            return new_achievements
-            
-        except Exception as e:
-            logger.error(f"Failed to check achievements: {e}")
-            return []
+                if new_progress >= achievement.target:
+                    new_achievements.append(achievement.id)
+                    bonus_xp += achievement.xp_reward
+        
+        # One write for all progress changes and one for the achievement XP
+        self.db.update_achievement_progress_bulk(progress_updates)
+        if bonus_xp:
+            self.db.award_xp(bonus_xp)
+        
+        return new_achievements
     
-    def _calculate_achievement_progress(self, achievement_id: str, user_stats: Dict[str, int]) -> int:
-        """Calculate current progress for an achievement"""
-        try:
-            progress_mapping = {
-                "first_organization": user_stats.get("filesOrganized", 0),
-                "file_organizer": user_stats.get("filesOrganized", 0),
-                "duplicate_hunter": user_stats.get("duplicatesRemoved", 0),
-                "quest_master": user_stats.get("questsCompleted", 0),
-                "storage_saver": 0  # This would need space freed tracking
-            }
-            
-            return progress_mapping.get(achievement_id, 0)
-            
-        except Exception as e:
-            logger.error(f"Failed to calculate achievement progress for {achievement_id}: {e}")
-            return 0
+    def _achievement_progress(self, user_stats: Dict[str, int]) -> Dict[str, int]:
+        """Current progress of every stat-tracked achievement, by achievement id"""
+        return {
+            achievement_id: user_stats.get(stat_key, 0)
+            for achievement_id, stat_key in self._PROGRESS_STAT_KEYS.items()
+        }
     
     def get_all_badges(self) -> List[Dict[str, Any]]:
         """Get all badges with their details"""
@@ -251,10 +356,9 @@ class RewardsSystem:
             user_stats = self.db.get_user_stats()
             
             # Update progress for each achievement
+            progress_mapping = self._achievement_progress(user_stats)
             for achievement in achievements:
-                achievement_id = achievement["id"]
-                current_progress = self._calculate_achievement_progress(achievement_id, user_stats)
-                achievement["progress"] = current_progress
+                achievement["progress"] = progress_mapping.get(achievement["id"], 0)
             
             return achievements
         except Exception as e:
@@ -264,19 +368,24 @@ class RewardsSystem:
     def get_user_rewards_summary(self) -> Dict[str, Any]:
         """Get a summary of user's rewards and progress"""
         try:
+            version = (self._rewards_version, self.db.user_data_version)
+            cached = self._cached_summary
+            if cached is not None and cached[0] == version:
+                return self._copy_summary(cached[1])
+            
             user_data = self.db.get_user_data()
             user_stats = self.db.get_user_stats()
             badges = self.get_all_badges()
             achievements = self.get_achievements()
             
-            earned_badges = user_data.get("badges", [])
+            earned_badges = set(user_data.get("badges", []))
             completed_achievements = [a for a in achievements if a.get("completed")]
             
             # Calculate next milestones
             next_level_xp = (user_data["level"] * 100) - user_data["xp"]
-            next_badges = self._get_next_badges(user_stats, earned_badges)
+            next_badges = self._get_next_badges(user_stats, earned_badges, limit=3)
             
-            return {
+            summary = {
                 "level": user_data["level"],
                 "xp": user_data["xp"],
                 "nextLevelXp": next_level_xp,
@@ -285,90 +394,82 @@ class RewardsSystem:
                 "totalAchievements": len(achievements),
                 "completedAchievements": len(completed_achievements),
                 "streak": user_data.get("streak", 0),
-                "nextBadges": next_badges[:3],  # Next 3 badges to unlock
-                "completionPercentage": self._calculate_completion_percentage(user_stats)
+                "nextBadges": next_badges,  # Next 3 badges to unlock
+                "completionPercentage": self._calculate_completion_percentage(user_stats, user_data["level"])
             }
             
+            self._cached_summary = (version, summary)
+            return self._copy_summary(summary)
+            
         except Exception as e:
             logger.error(f"Failed to get user rewards summary: {e}")
             return {}
     
-    def _get_next_badges(self, user_stats: Dict[str, int], earned_badges: List[str]) -> List[Dict[str, Any]]:
-        """Get the next badges user can unlock"""
-        try:
-            next_badges = []
-            
-            for badge_id, requirements in self.badge_requirements.items():
-                if badge_id in earned_badges:
-                    continue
-                
-                req_type = requirements["type"]
-                req_value = requirements["requirement"]
-                
-                current_value = 0
-                badge_name = badge_id.replace("_", " ").title()
-                
-                if req_type == "files_organized":
-                    current_value = user_stats.get("filesOrganized", 0)
-                elif req_type == "duplicates_removed":
-                    current_value = user_stats.get("duplicatesRemoved", 0)
-                elif req_type == "total_quests":
-                    current_value = user_stats.get("questsCompleted", 0)
+    @staticmethod
+    def _copy_summary(summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a memoized summary that callers may modify"""
+        return {**summary, "nextBadges": [dict(badge) for badge in summary["nextBadges"]]}
+    
+    @_safe("get next badges")
+    def _get_next_badges(self, user_stats: Dict[str, int], earned_badges: Set[str],
+                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the next badges user can unlock, closest to completion first"""
+        next_badges = []
+        stat_lookup = {
+            req_type: user_stats.get(stat_key, 0)
+            for req_type, stat_key in _STAT_KEY_OF_TYPE.items()
+        }
+        
+        for badge_id, requirements in self.badge_requirements.items():
+            if badge_id in earned_badges:
+                continue
+            
+            req_type = requirements["type"]
+            req_value = requirements["requirement"]
+            current_value = stat_lookup.get(req_type, 0)
+            
+            if current_value < req_value:
+                progress = (current_value / req_value) * 100
+                remaining = req_value - current_value
                 
-                if current_value < req_value:
-                    progress = (current_value / req_value) * 100
-                    remaining = req_value - current_value
-                    
-                    next_badges.append({
-                        "id": badge_id,
-                        "name": badge_name,
-                        "progress": min(progress, 99),  # Cap at 99% until earned
-                        "remaining": remaining,
-                        "type": req_type
-                    })
-            
-            # Sort by progress (closest to completion first)
-            next_badges.sort(key=lambda x: x["progress"], reverse=True)
-            return next_badges
-            
-        except Exception as e:
-            logger.error(f"Failed to get next badges: {e}")
-            return []
+                next_badges.append({
+                    "id": badge_id,
+                    "name": badge_id.replace("_", " ").title(),
+                    "progress": min(progress, 99),  # Cap at 99% until earned
+                    "remaining": remaining,
+                    "type": req_type
+                })
+        
+        # Sort by progress; only a partial selection when the caller wants the top few
+        if limit is not None:
+            return heapq.nlargest(limit, next_badges, key=itemgetter("progress"))
+        next_badges.sort(key=itemgetter("progress"), reverse=True)
+        return next_badges
     
-    def _calculate_completion_percentage(self, user_stats: Dict[str, int]) -> float:
+    def _calculate_completion_percentage(self, user_stats: Dict[str, int], level: int) -> float:
         """Calculate overall completion percentage"""
-        try:
-            total_metrics = 4  # files organized, duplicates removed, quests completed, level
-            completed_metrics = 0
-            
-            if user_stats.get("filesOrganized", 0) > 0:
-                completed_metrics += 1
-            if user_stats.get("duplicatesRemoved", 0) > 0:
-                completed_metrics += 1
-            if user_stats.get("questsCompleted", 0) > 0:
-                completed_metrics += 1
-            
-            user_data = self.db.get_user_data()
-            if user_data.get("level", 1) > 1:
-                completed_metrics += 1
-            
-            return (completed_metrics / total_metrics) * 100
-            
-        except Exception as e:
-            logger.error(f"Failed to calculate completion percentage: {e}")
-            return 0.0
+        # One metric each: files organized, duplicates removed, quests completed, level
+        completed_metrics = (
+            (user_stats.get("filesOrganized", 0) > 0)
+            + (user_stats.get("duplicatesRemoved", 0) > 0)
+            + (user_stats.get("questsCompleted", 0) > 0)
+            + (level > 1)
+        )
+        return completed_metrics * 25.0
     
     def award_bonus_xp(self, reason: str, amount: int) -> bool:
         """Award bonus XP for special achievements"""
         try:
             self.db.award_xp(amount)
+            self._invalidate_summary()
             
-            # Log the bonus XP
-            self.db.add_activity({
+            # Log the bonus XP in the background; the timestamp is taken now so
+            # the entry records when the XP was awarded, not when it was written
+            self._background.submit(self._log_activity, {
                 "type": "bonus_xp",
                 "description": f"Bonus XP: {reason}",
                 "xp": amount,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(timespec="seconds")
             })
             
             return True
@@ -380,18 +481,14 @@ class RewardsSystem:
     def get_daily_bonus_eligibility(self) -> Dict[str, Any]:
         """Check if user is eligible for daily bonuses"""
         try:
-            user_data = self.db.get_user_data()
-            last_active = user_data.get("last_active")
+            last_active_day = self.db.get_last_active_day()
             
-            if not last_active:
+            if last_active_day is None:
                 return {"eligible": True, "bonus_type": "welcome", "amount": 50}
             
-            last_active_date = datetime.fromisoformat(last_active).date()
-            today = datetime.now().date()
-            
-            if last_active_date < today:
+            if last_active_day < date.today().toordinal() - _EPOCH_ORDINAL:
                 # Check for streak bonus
-                streak = user_data.get("streak", 0)
+                streak = self.db.get_user_data().get("streak", 0)
                 if streak >= 7:
                     return {"eligible": True, "bonus_type": "streak", "amount": 25}
                 elif streak >= 3: